@@ -1,3 +1,6 @@
+from regex_ast import (CharClass, Star, Plus, Optional, Tag, EPSILON, char, concat, alt,
+                       normalize_ranges, ranges_difference, ranges_complement)
+
 def sp_manual(texto):
     inicio = 0
     while inicio < len(texto) and texto[inicio] in [' ', '\t', '\n', '\r']:
@@ -49,21 +52,19 @@ def remove_comments(texto):
     """
     Elimina comentarios delimitados por (* y *) recorriendo el texto carácter a carácter.
     """
-    resultado = ""
+    partes = []
     i = 0
-    while i < len(texto):
-        if texto[i] == '(' and i + 1 < len(texto) and texto[i+1] == '*':
-            i += 2  # Salta "(*"
-            while i < len(texto):
-                if texto[i] == '*' and i + 1 < len(texto) and texto[i+1] == ')':
-                    i += 2
-                    break
-                else:
-                    i += 1
-        else:
-            resultado += texto[i]
-            i += 1
-    return resultado
+    while True:
+        inicio = texto.find("(*", i)
+        if inicio == -1:
+            partes.append(texto[i:])
+            break
+        partes.append(texto[i:inicio])
+        fin = texto.find("*)", inicio + 2)  # Salta "(*"
+        if fin == -1:
+            break
+        i = fin + 2
+    return "".join(partes)
 
 def skip_whitespace(line, i):
     """Avanza el índice 'i' mientras haya espacios, tabs o saltos de línea."""
@@ -93,11 +94,7 @@ def parse_definiciones_char_by_char(lines):
             if i < len(line) and line[i] == '=':
                 i += 1
             i = skip_whitespace(line, i)
-            expresion = ""
-            while i < len(line):
-                expresion += line[i]
-                i += 1
-            definiciones[nombre] = expresion
+            definiciones[nombre] = line[i:]
     return definiciones
 
 def parse_reglas_char_by_char(lines):
@@ -123,30 +120,15 @@ def parse_reglas_char_by_char(lines):
             i = skip_whitespace(line, i)
         if i >= len(line):
             continue
-        expresion = ""
         accion = None
-        j = i
-        brace_index = -1
-        while j < len(line):
-            if line[j] == '{':
-                brace_index = j
-                break
-            j += 1
+        brace_index = line.find('{', i)
         if brace_index == -1:
             expresion = sp_rstrip(line[i:], '\n')
         else:
             expresion = line[i:brace_index]
-            j = brace_index + 1
-            accion_temp = ""
-            llave_cerrada = False
-            while j < len(line):
-                if line[j] == '}':
-                    llave_cerrada = True
-                    break
-                accion_temp += line[j]
-                j += 1
-            if llave_cerrada:
-                accion = sp_manual(accion_temp)
+            cierre = line.find('}', brace_index + 1)
+            if cierre != -1:
+                accion = sp_manual(line[brace_index+1:cierre])
         reglas.append({"expresion": sp_manual(expresion), "accion": accion})
     return reglas
 
@@ -159,16 +141,10 @@ def parse_yal_config(texto):
     Retorna un diccionario con 'definiciones' y 'reglas'.
     """
     texto_sin_comentarios = remove_comments(texto)
-    lines = []
-    current_line = ""
-    for ch in texto_sin_comentarios:
-        if ch == '\n':
-            lines.append(current_line)
-            current_line = ""
-        else:
-            current_line += ch
-    if current_line:
-        lines.append(current_line)
+    lines = texto_sin_comentarios.split('\n')
+    # Un salto de línea final no abre una línea vacía
+    if not lines[-1]:
+        lines.pop()
     definiciones = parse_definiciones_char_by_char(lines)
     reglas = parse_reglas_char_by_char(lines)
     return {"definiciones": definiciones, "reglas": reglas}
@@ -178,38 +154,31 @@ def reemplazar_punto_literal(expr):
     Reemplaza el punto literal '.' por su ASCII '46' cuando aparece como parte de una expresión,
     evitando confundirlo con el operador de concatenación.
     """
-    resultado = ""
+    partes = []
     i = 0
-    while i < len(expr):
-        if expr[i] == '.':
-            # Verifica si después hay un grupo o número
-            if i + 1 < len(expr) and (expr[i+1].isdigit() or expr[i+1] == '('):
-                resultado += '46.'
-                i += 1
-            else:
-                resultado += '.'
-                i += 1
+    while True:
+        j = expr.find('.', i)
+        if j == -1:
+            partes.append(expr[i:])
+            return "".join(partes)
+        partes.append(expr[i:j])
+        # Verifica si después hay un grupo o número
+        if j + 1 < len(expr) and (expr[j+1].isdigit() or expr[j+1] == '('):
+            partes.append('46.')
         else:
-            resultado += expr[i]
-            i += 1
-    return resultado
+            partes.append('.')
+        i = j + 1
 
 
 def manual_split(expr, delimiter):
     """
     Separa manualmente una cadena por el delimitador, carácter a carácter.
     """
-    parts = []
-    current = ""
-    for ch in expr:
-        if ch == delimiter:
-            parts.append(sp_manual(current))
-            current = ""
-        else:
-            current += ch
-    if current:
-        parts.append(sp_manual(current))
-    return parts
+    parts = expr.split(delimiter)
+    # Un delimitador final no agrega una parte vacía
+    if not parts[-1]:
+        parts.pop()
+    return [sp_manual(part) for part in parts]
 
 
 def expand_repetition_operators(expr: str) -> str:
@@ -219,44 +188,47 @@ def expand_repetition_operators(expr: str) -> str:
     - A? por (A|949)
     Evita paréntesis extra y respeta agrupaciones como "46.(digits)" para '?' correctamente.
     """
-    i = 0
-    result = ""
-    while i < len(expr):
-        if expr[i] in ['+', '?'] and i > 0:
+    # El resultado se acumula carácter a carácter en una lista; 'pareja' guarda
+    # para cada ')' del resultado el índice de su '(' para no buscarlo hacia atrás
+    result = []
+    abiertos = []
+    pareja = {}
+
+    def agregar(texto):
+        for ch in texto:
+            if ch == '(':
+                abiertos.append(len(result))
+            elif ch == ')':
+                if abiertos:
+                    pareja[len(result)] = abiertos.pop()
+                else:
+                    pareja.pop(len(result), None)
+            result.append(ch)
+
+    for i, ch in enumerate(expr):
+        if ch in ['+', '?'] and i > 0:
             # Buscar el operando anterior
             j = len(result) - 1
 
-            # Si termina en ')', retrocede para encontrar grupo
+            # Si termina en ')', el grupo empieza en su '(' (o es solo el ')' si no la tiene)
             if result[j] == ')':
-                count = 1
-                j -= 1
-                while j >= 0:
-                    if result[j] == ')':
-                        count += 1
-                    elif result[j] == '(':
-                        count -= 1
-                        if count == 0:
-                            break
-                    j -= 1
-                prev = result[j:]
-                result = result[:j]
+                inicio = pareja.get(j, j)
             else:
                 # Si es un número (como 46) posiblemente con punto antes → "46." → tomarlo completo
-                k = j
-                while k >= 0 and (result[k].isdigit() or result[k] == '.'):
-                    k -= 1
-                prev = result[k+1:]
-                result = result[:k+1]
-
-            if expr[i] == '+':
-                result += f"{prev}({prev})*"
-            elif expr[i] == '?':
-                result += f"({prev}|949)"
-            i += 1
+                inicio = j
+                while inicio >= 0 and (result[inicio].isdigit() or result[inicio] == '.'):
+                    inicio -= 1
+                inicio += 1
+            prev = "".join(result[inicio:])
+            del result[inicio:]
+
+            if ch == '+':
+                agregar(f"{prev}({prev})*")
+            else:
+                agregar(f"({prev}|949)")
         else:
-            result += expr[i]
-            i += 1
-    return result
+            agregar(ch)
+    return "".join(result)
 
 
 def find_top_level_hash(expr):
@@ -398,13 +370,13 @@ def expand_rangos(expresion):
         diff_set = sorted(set(left_parts) - set(right_parts))
         return "(" + "|".join(tok for tok in (ascii_token(tok) for tok in diff_set) if tok) + ")"
     
-    resultado = ""
+    resultado = []
     i = 0
     while i < len(expresion):
         if expresion[i] == '[':
             j = expresion.find(']', i)
             if j == -1:
-                resultado += expresion[i:]
+                resultado.append(expresion[i:])
                 break
             contenido = expresion[i+1:j]
             if contenido.startswith('^'):
@@ -499,7 +471,7 @@ def expand_rangos(expresion):
                     expanded = "(" + "|".join(ascii_tokens) + ")"
 
 
-            resultado += expanded
+            resultado.append(expanded)
             i = j + 1
         else:
         # Si es una comilla abriendo literal
@@ -523,54 +495,109 @@ def expand_rangos(expresion):
                         literal += expresion[i]
                         i += 1
                 i += 1  # Saltar comilla final
-                resultado += "(" + "|".join(tok for tok in (ascii_token(c) for c in literal) if tok) + ")"
+                resultado.append("(" + "|".join(tok for tok in (ascii_token(c) for c in literal) if tok) + ")")
             else:
-                resultado += expresion[i]
+                resultado.append(expresion[i])
                 i += 1
 
-    return resultado
+    return "".join(resultado)
 
-def expand_identificadores(expresion, definiciones):
+def partir_identificadores(expresion):
     """
-    Reemplaza recursivamente los identificadores (definidos con let)
-    por sus expresiones correspondientes, carácter a carácter.
+    Recorre la expresión carácter a carácter y genera tuplas (es_identificador, texto):
+    los identificadores por un lado y el resto (literales entre comillas
+    incluidas) por otro, en orden.
     """
-    resultado = ""
     i = 0
     while i < len(expresion):
         ch = expresion[i]
         if ch in ["'", '"']:
             quote_char = ch
-            resultado += ch
+            inicio = i
             i += 1
             while i < len(expresion):
-                resultado += expresion[i]
                 if expresion[i] == quote_char:
                     i += 1
                     break
                 i += 1
+            yield False, expresion[inicio:i]
         elif ch.isalpha() or ch == '_':
             inicio = i
             while i < len(expresion) and (expresion[i].isalnum() or expresion[i] == '_'):
                 i += 1
-            token = expresion[inicio:i]
-            if token in definiciones:
-                subexp = expand_identificadores(definiciones[token], definiciones)
-                subexp = reducir_parentesis(subexp)
-                resultado += f"({subexp})"
+            yield True, expresion[inicio:i]
+        else:
+            yield False, ch
+            i += 1
 
+def orden_definiciones(definiciones):
+    """
+    Retorna los nombres de las definiciones (let) en orden topológico: cada
+    una aparece después de todas las que usa.
 
-            else:
-                if token == ["_", "(_)"]:
-                    ALPHABET = obtener_alfabeto()
-                    union = "|".join(tok for tok in sorted(ascii_token(x) for x in ALPHABET) if tok)
-                    resultado += "(" + union + ")"
-                else:
-                    resultado += token
+    Lanza ValueError si las definiciones se referencian en ciclo.
+    """
+    orden = []
+    resueltas = set()
+    for nombre in definiciones:
+        if nombre in resueltas:
+            continue
+        # DFS iterativo: la pila guarda el camino de definiciones en curso
+        pila = [(nombre, None)]
+        en_curso = set()
+        while pila:
+            actual, pendientes = pila[-1]
+            if pendientes is None:
+                en_curso.add(actual)
+                pendientes = [token for es_id, token in partir_identificadores(definiciones[actual])
+                              if es_id and token in definiciones]
+                pila[-1] = (actual, pendientes)
+            while pendientes and pendientes[-1] in resueltas:
+                pendientes.pop()
+            if pendientes:
+                siguiente = pendientes.pop()
+                if siguiente in en_curso:
+                    camino = [n for n, _ in pila]
+                    ciclo = camino[camino.index(siguiente):] + [siguiente]
+                    raise ValueError(f"Definición cíclica: {' -> '.join(ciclo)}")
+                pila.append((siguiente, None))
+                continue
+            pila.pop()
+            en_curso.discard(actual)
+            resueltas.add(actual)
+            orden.append(actual)
+    return orden
+
+def resolver_definiciones(definiciones):
+    """
+    Expande cada definición (let) una sola vez, en orden topológico: cuando
+    se expande una definición, las que usa ya están expandidas y se
+    reutilizan tal cual. Retorna {ident: expansión}.
+    """
+    expandidas = {}
+    for nombre in orden_definiciones(definiciones):
+        expandidas[nombre] = reducir_parentesis(sustituir_identificadores(definiciones[nombre], expandidas))
+    return expandidas
+
+def sustituir_identificadores(expresion, expandidas):
+    """Reemplaza los identificadores de 'expresion' por sus expansiones ya resueltas, entre paréntesis."""
+    partes = []
+    for es_id, token in partir_identificadores(expresion):
+        if es_id and token in expandidas:
+            partes.append(f"({expandidas[token]})")
         else:
-            resultado += ch
-            i += 1
-    return resultado
+            partes.append(token)
+    return "".join(partes)
+
+def expand_identificadores(expresion, definiciones, expandidas=None):
+    """
+    Reemplaza los identificadores (definidos con let) por sus expresiones
+    correspondientes. 'expandidas' es el resultado de resolver_definiciones;
+    si no se pasa, se calcula a partir de 'definiciones'.
+    """
+    if expandidas is None:
+        expandidas = resolver_definiciones(definiciones)
+    return sustituir_identificadores(expresion, expandidas)
 
 def limpiar_parentesis(expresion):
     """
@@ -642,7 +669,7 @@ def insertar_concatenaciones(expr):
     Inserta '.' donde se requiere concatenación entre tokens.
     Evita insertar '.' entre operadores de unión '|' y mantiene literales agrupadas.
     """
-    resultado = ""
+    resultado = []
     i = 0
 
     def es_token_que_concatenamos(ch):
@@ -652,30 +679,27 @@ def insertar_concatenaciones(expr):
         return ch.isdigit() or ch == '(' or ch == '949'
 
     while i < len(expr):
-        actual = expr[i]
-
-        token = ""
-        if actual.isdigit():
+        inicio = i
+        if expr[i].isdigit():
             while i < len(expr) and expr[i].isdigit():
-                token += expr[i]
                 i += 1
         else:
-            token = actual
             i += 1
+        token = expr[inicio:i]
 
-        if resultado:
-            prev = resultado[-1]
-            if es_token_que_concatenamos(prev) and es_token_inicio(token[0]):
-                resultado += '.'
+        if resultado and es_token_que_concatenamos(resultado[-1][-1]) and es_token_inicio(token[0]):
+            resultado.append('.')
 
-        resultado += token
+        resultado.append(token)
 
-    return resultado
+    return "".join(resultado)
 
 def combine_expressions(config):
     combined = []
     mapping = {}
     rule_id = 0
+    # Cada definición se expande una sola vez y se comparte entre todas las reglas
+    expandidas = resolver_definiciones(config["definiciones"])
 
     for regla in config["reglas"]:
         raw_expr = regla["expresion"]
@@ -690,7 +714,7 @@ def combine_expressions(config):
         elif len(raw_expr) == 1:
             final_expr = ascii_token(raw_expr)
         else:
-            exp_ids = expand_identificadores(raw_expr, config["definiciones"])
+            exp_ids = expand_identificadores(raw_expr, config["definiciones"], expandidas)
             expanded = expand_rangos(exp_ids)
             limpio = limpiar_parentesis(expanded)
             limpio = reemplazar_punto_literal(limpio)
@@ -725,16 +749,232 @@ def combine_expressions(config):
 
 
 
+
+# ==== Parser de expresiones a árbol (regex_ast) ====
+
+ESCAPES = {'s': ' ', 't': '\t', 'n': '\n'}
+
+# Alfabetos para las negaciones [^...], como rangos de code points. El de
+# siempre es ASCII imprimible, igual que obtener_alfabeto.
+ALFABETOS = {
+    'imprimible': ((32, 126),),
+    'ascii': ((0, 127),),
+    'latin1': ((0, 255),),
+    'unicode': ((0, 0xD7FF), (0xE000, 0x10FFFF)),
+}
+ALFABETO = ALFABETOS['imprimible']
+
+def leer_escape(texto, i):
+    """'texto[i]' es una barra invertida: retorna (carácter escapado, índice siguiente)."""
+    if i + 1 >= len(texto):
+        return '\\', i + 1
+    return ESCAPES.get(texto[i+1], texto[i+1]), i + 2
+
+def leer_literal(texto, i):
+    """'texto[i]' es una comilla: retorna (contenido del literal, índice tras la comilla de cierre)."""
+    quote_char = texto[i]
+    i += 1
+    literal = []
+    while i < len(texto) and texto[i] != quote_char:
+        if texto[i] == '\\':
+            ch, i = leer_escape(texto, i)
+        else:
+            ch = texto[i]
+            i += 1
+        literal.append(ch)
+    return ''.join(literal), i + 1
+
+def leer_conjunto(texto, i, alfabeto=ALFABETO):
+    """
+    'texto[i]' es '[': retorna (rangos del conjunto, índice tras el ']').
+    Admite literales entre comillas, rangos 'a'-'z' o a-z, escapes y la
+    negación [^...] respecto de 'alfabeto'.
+    """
+    i += 1
+    negado = i < len(texto) and texto[i] == '^'
+    if negado:
+        i += 1
+    rangos = []
+    while i < len(texto) and texto[i] != ']':
+        if texto[i] in ["'", '"']:
+            literal, i = leer_literal(texto, i)
+            # Rango entre dos literales de un carácter: 'a'-'z'
+            if (len(literal) == 1 and i + 1 < len(texto) and texto[i] == '-'
+                    and texto[i+1] in ["'", '"']):
+                hasta, i = leer_literal(texto, i + 1)
+                if len(hasta) == 1:
+                    rangos.append((ord(literal), ord(hasta)))
+                    continue
+                literal += '-' + hasta
+            rangos.extend((ord(ch), ord(ch)) for ch in literal)
+        elif texto[i] == '\\':
+            ch, i = leer_escape(texto, i)
+            rangos.append((ord(ch), ord(ch)))
+        elif i + 2 < len(texto) and texto[i+1] == '-' and texto[i+2] != ']':
+            rangos.append((ord(texto[i]), ord(texto[i+2])))
+            i += 3
+        else:
+            rangos.append((ord(texto[i]), ord(texto[i])))
+            i += 1
+    if i >= len(texto):
+        raise ValueError(f"Conjunto sin cerrar: '{texto}'")
+    rangos = normalize_ranges(rangos)
+    if negado:
+        rangos = ranges_complement(rangos, alfabeto)
+    return rangos, i + 1
+
+def clase_o_epsilon(rangos):
+    # Un conjunto vacío se trata como épsilon, igual que '()' en el pipeline de cadenas
+    return CharClass(rangos) if rangos else EPSILON
+
+def parse_union(texto, i, definiciones_ast, alfabeto=ALFABETO):
+    opciones = []
+    while True:
+        nodo, i = parse_concatenacion(texto, i, definiciones_ast, alfabeto)
+        opciones.append(nodo)
+        i = skip_whitespace(texto, i)
+        if i < len(texto) and texto[i] == '|':
+            i += 1
+            continue
+        return alt(opciones), i
+
+def parse_concatenacion(texto, i, definiciones_ast, alfabeto=ALFABETO):
+    partes = []
+    while True:
+        i = skip_whitespace(texto, i)
+        if i >= len(texto) or texto[i] in '|)':
+            return concat(partes), i
+        nodo, i = parse_postfijo(texto, i, definiciones_ast, alfabeto)
+        partes.append(nodo)
+
+def parse_postfijo(texto, i, definiciones_ast, alfabeto=ALFABETO):
+    nodo, i = parse_diferencia(texto, i, definiciones_ast, alfabeto)
+    while True:
+        i = skip_whitespace(texto, i)
+        if i >= len(texto) or texto[i] not in '*+?':
+            return nodo, i
+        if nodo is not EPSILON:
+            nodo = {'*': Star, '+': Plus, '?': Optional}[texto[i]](nodo)
+        i += 1
+
+def parse_diferencia(texto, i, definiciones_ast, alfabeto=ALFABETO):
+    """Diferencia de conjuntos 'A # B', el operador de mayor precedencia."""
+    nodo, i = parse_atomo(texto, i, definiciones_ast, alfabeto)
+    while True:
+        i = skip_whitespace(texto, i)
+        if i >= len(texto) or texto[i] != '#':
+            return nodo, i
+        derecho, i = parse_atomo(texto, skip_whitespace(texto, i + 1), definiciones_ast, alfabeto)
+        nodo = clase_o_epsilon(ranges_difference(rangos_conjunto(nodo, texto), rangos_conjunto(derecho, texto)))
+
+def rangos_conjunto(nodo, texto):
+    """Rangos de un operando de '#', que debe ser un conjunto de caracteres."""
+    if nodo is EPSILON:
+        return ()
+    if not isinstance(nodo, CharClass):
+        raise ValueError(f"El operador '#' solo se aplica a conjuntos de caracteres: '{texto}'")
+    return nodo.ranges
+
+def parse_atomo(texto, i, definiciones_ast, alfabeto=ALFABETO):
+    if i >= len(texto):
+        raise ValueError(f"Expresión incompleta: '{texto}'")
+    ch = texto[i]
+    if ch == '(':
+        nodo, i = parse_union(texto, i + 1, definiciones_ast, alfabeto)
+        if i >= len(texto) or texto[i] != ')':
+            raise ValueError(f"Falta ')' en: '{texto}'")
+        return nodo, i + 1
+    if ch == '[':
+        rangos, i = leer_conjunto(texto, i, alfabeto)
+        return clase_o_epsilon(rangos), i
+    if ch in ["'", '"']:
+        literal, i = leer_literal(texto, i)
+        return concat(char(ord(c)) for c in literal), i
+    if ch == '\\':
+        ch, i = leer_escape(texto, i)
+        return char(ord(ch)), i
+    if ch.isalpha() or ch == '_':
+        inicio = i
+        while i < len(texto) and (texto[i].isalnum() or texto[i] == '_'):
+            i += 1
+        nombre = texto[inicio:i]
+        if nombre in definiciones_ast:
+            return definiciones_ast[nombre], i
+        if nombre == '_':
+            # Se conserva la semántica del pipeline de cadenas, donde
+            # shunting traduce '_' a épsilon
+            return EPSILON, i
+        raise ValueError(f"Identificador no definido: '{nombre}'")
+    if ch in '*+?#':
+        raise ValueError(f"Operador '{ch}' sin operando en: '{texto}'")
+    # Cualquier otro carácter, incluido '.', es un literal
+    return char(ord(ch)), i + 1
+
+def parsear_regex(texto, definiciones_ast, alfabeto=ALFABETO):
+    """
+    Parsea una expresión regular de YAL y retorna su árbol (regex_ast).
+    'definiciones_ast' tiene los árboles de las definiciones ya parseadas,
+    que se reutilizan en cada referencia sin volver a expandirlas.
+    'alfabeto' son los rangos de code points respecto de los que se niegan
+    los conjuntos [^...].
+    """
+    nodo, i = parse_union(texto, 0, definiciones_ast, alfabeto)
+    if i < len(texto):
+        raise ValueError(f"')' sin abrir en la posición {i} de: '{texto}'")
+    return nodo
+
+def construir_ast(config, alfabeto=ALFABETO):
+    """
+    Construye el árbol de la expresión maestra a partir de la configuración
+    de parse_yal_config: la unión de todas las reglas, cada una seguida de su
+    tag (#1000, #1001, ...). Las definiciones se parsean una sola vez, en
+    orden topológico.
+
+    'alfabeto' es uno de los nombres de ALFABETOS o directamente una tupla
+    de rangos de code points; define qué abarcan las negaciones [^...].
+
+    Retorna:
+        tuple: (árbol, mapping) con mapping = {tag: acción}.
+    """
+    if isinstance(alfabeto, str):
+        if alfabeto not in ALFABETOS:
+            raise ValueError(f"Alfabeto desconocido: '{alfabeto}' (opciones: {', '.join(ALFABETOS)})")
+        alfabeto = ALFABETOS[alfabeto]
+
+    definiciones = config["definiciones"]
+    definiciones_ast = {}
+    for nombre in orden_definiciones(definiciones):
+        definiciones_ast[nombre] = parsear_regex(definiciones[nombre], definiciones_ast, alfabeto)
+
+    reglas = []
+    mapping = {}
+    for rule_id, regla in enumerate(config["reglas"]):
+        raw_expr = regla["expresion"]
+        if len(raw_expr) == 1:
+            # Un carácter suelto es siempre literal (p. ej. '_' o '+')
+            nodo = char(ord(raw_expr))
+        else:
+            nodo = parsear_regex(raw_expr, definiciones_ast, alfabeto)
+        tag_number = 1000 + rule_id
+        reglas.append(concat([nodo, Tag(tag_number)]))
+        mapping[f"#{tag_number}"] = regla["accion"]
+
+    if not reglas:
+        raise ValueError("La especificación no tiene reglas.")
+    return alt(reglas), mapping
+
+
 # MAIN
 if __name__ == '__main__':
     ruta_yal = "slr-3.yal"  # Cambia este nombre por el de tu archivo YAL.
     contenido = leer_archivo(ruta_yal)
     config = parse_yal_config(contenido)
 
+    expandidas = resolver_definiciones(config["definiciones"])
     print("Definiciones encontradas:")
     for nombre, expresion in config["definiciones"].items():
         print(f"{nombre} = {expresion}")
-        exp_ids = expand_identificadores(expresion, config["definiciones"])
+        exp_ids = expand_identificadores(expresion, config["definiciones"], expandidas)
         expanded = expand_rangos(exp_ids)
         limpio = limpiar_parentesis(expanded)
         final = expand_optionals(reducir_parentesis(limpio))
@@ -763,7 +1003,7 @@ if __name__ == '__main__':
             print(f"  Limpio: {ascii_literal}")
             print(f"  Final con opcionales: {ascii_literal}")
         else:
-            exp_ids = expand_identificadores(raw_expr, config["definiciones"])
+            exp_ids = expand_identificadores(raw_expr, config["definiciones"], expandidas)
             expanded = expand_rangos(exp_ids)
             limpio = limpiar_parentesis(expanded)
             final = expand_optionals(limpio)
@@ -0,0 +1,150 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+# Cambiar esta versión cada vez que cambie el pipeline de construcción o el
+# formato del AFD: invalida todas las entradas guardadas con la anterior.
+VERSION_COMPILADOR = '8'
+
+DIRECTORIO_CACHE = 'output_afds/cache'
+LIMITE_BYTES = 64 * 1024 * 1024
+# Un .tmp más viejo que esto quedó de un guardar_cache interrumpido
+EDAD_TEMPORAL = 3600
+
+def clave_yal(texto, variante=''):
+    """
+    Retorna la clave de caché de una especificación YAL: sha256 del texto y
+    la versión del compilador. 'variante' distingue AFD compilados del
+    mismo texto con otras opciones (alfabeto, modo bytes).
+    """
+    if variante:
+        texto = f"{variante}\0{texto}"
+    contenido = f"{VERSION_COMPILADOR}\0{texto}".encode('utf-8')
+    return hashlib.sha256(contenido).hexdigest()
+
+def variante_de(alfabeto='imprimible', utf8=False):
+    """Variante de caché para las opciones de compilación; vacía con las opciones por defecto."""
+    variante = f"{alfabeto}{'|utf8' if utf8 else ''}"
+    return '' if variante == 'imprimible' else variante
+
+def _ruta_entrada(clave, directorio):
+    return os.path.join(directorio, f"{clave}.pkl")
+
+def cargar_cache(texto, directorio=DIRECTORIO_CACHE, variante=''):
+    """
+    Busca en la caché el AFD minimizado compilado a partir de 'texto'.
+
+    Retorna:
+        tuple | None: (afd_dict_min, mapping) si hay una entrada válida, None si no.
+    """
+    clave = clave_yal(texto, variante)
+    ruta = _ruta_entrada(clave, directorio)
+    # Otro proceso puede desalojar la entrada en cualquier momento: un
+    # archivo que desaparece es simplemente una entrada que no está
+    try:
+        with open(ruta, 'rb') as f:
+            entrada = pickle.load(f)
+        if entrada.get('version') != VERSION_COMPILADOR or entrada.get('clave') != clave:
+            raise ValueError("entrada de otra versión")
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrada corrupta o de otra versión: se descarta y se reconstruye
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(ruta)
+        return None
+
+    # La fecha de modificación lleva el orden LRU
+    with contextlib.suppress(FileNotFoundError):
+        os.utime(ruta)
+    return entrada['afd'], entrada['mapping']
+
+def guardar_cache(texto, afd_dict_min, mapping, directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES, variante=''):
+    """
+    Guarda el AFD minimizado y su mapping de tags bajo la clave de 'texto' y
+    desaloja las entradas menos usadas si la caché supera 'limite_bytes'.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    clave = clave_yal(texto, variante)
+    ruta = _ruta_entrada(clave, directorio)
+    entrada = {'version': VERSION_COMPILADOR, 'clave': clave, 'afd': afd_dict_min, 'mapping': mapping}
+
+    # Escritura atómica para que otro proceso nunca lea una entrada a medias;
+    # el temporal tiene nombre único aunque dos hilos guarden la misma clave
+    with tempfile.NamedTemporaryFile('wb', dir=directorio, prefix=f"{clave}.", suffix='.tmp', delete=False) as f:
+        pickle.dump(entrada, f)
+    os.replace(f.name, ruta)
+
+    desalojar_cache(directorio, limite_bytes, conservar=ruta)
+
+def desalojar_cache(directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES, conservar=None):
+    """
+    Elimina las entradas usadas hace más tiempo hasta que la caché ocupe a
+    lo sumo 'limite_bytes'. Los .tmp de más de EDAD_TEMPORAL segundos
+    quedaron de una escritura interrumpida y se eliminan siempre; los más
+    recientes pueden ser de otro proceso que está guardando y solo cuentan
+    en el tamaño. Las entradas que otro proceso elimina mientras tanto se
+    ignoran.
+    """
+    if not os.path.isdir(directorio):
+        return
+    viejo = time.time() - EDAD_TEMPORAL
+    entradas = []
+    total = 0
+    for nombre in os.listdir(directorio):
+        es_temporal = nombre.endswith('.tmp')
+        if not (es_temporal or nombre.endswith('.pkl')):
+            continue
+        ruta = os.path.join(directorio, nombre)
+        try:
+            info = os.stat(ruta)
+        except FileNotFoundError:
+            continue
+        if es_temporal and info.st_mtime < viejo:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(ruta)
+            continue
+        total += info.st_size
+        if not es_temporal:
+            entradas.append((info.st_mtime, info.st_size, ruta))
+
+    for _, tamano, ruta in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        if ruta == conservar:
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(ruta)
+        total -= tamano
+
+def invalidar_cache(texto=None, directorio=DIRECTORIO_CACHE, variante=''):
+    """Elimina la entrada de 'texto', o toda la caché si no se indica ningún texto."""
+    if texto is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(_ruta_entrada(clave_yal(texto, variante), directorio))
+        return
+    if os.path.isdir(directorio):
+        for nombre in os.listdir(directorio):
+            if nombre.endswith('.pkl'):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(directorio, nombre))
+
+def obtener_afd(texto, construir, directorio=DIRECTORIO_CACHE, forzar=False, variante=''):
+    """
+    Retorna (afd_dict_min, mapping) para la especificación 'texto', desde la
+    caché si es posible. En caso contrario llama a construir(texto), que debe
+    retornar esa misma tupla, y guarda el resultado.
+
+    Parámetros:
+        forzar (bool): Ignora la entrada existente y reconstruye el AFD.
+    """
+    if not forzar:
+        encontrado = cargar_cache(texto, directorio, variante)
+        if encontrado is not None:
+            return encontrado
+    afd_dict_min, mapping = construir(texto)
+    guardar_cache(texto, afd_dict_min, mapping, directorio, variante=variante)
+    return afd_dict_min, mapping
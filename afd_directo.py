@@ -1,15 +1,113 @@
 import os
+import sys
+from collections import deque
 import graphviz
+from regex_ast import CharClass, Epsilon, Concat, Alt, Star, Plus, Optional, Tag, normalize_ranges, ranges_union
 
 class Node:
+    # Sin __dict__ por instancia: los árboles de gramáticas grandes tienen
+    # cientos de miles de nodos.
+    __slots__ = ('value', 'left', 'right', 'firstpos', 'lastpos', 'nullable',
+                 'position', 'symbols', 'classes')
+
     def __init__(self, value, left=None, right=None):
         self.value = value
         self.left = left
         self.right = right
-        self.firstpos = set()
-        self.lastpos = set()
+        # Conjuntos de posiciones como máscaras de bits: el bit i es la posición i.
+        # compute_followpos los calcula al vuelo y solo los deja en la raíz.
+        self.firstpos = 0
+        self.lastpos = 0
         self.nullable = False
         self.position = None
+        # Hojas de símbolo: códigos que acepta la hoja y sus clases de símbolos
+        self.symbols = None
+        self.classes = None
+
+# Conjunto de un solo código compartido por todas las hojas de ese código
+_single_symbols = {}
+
+def single_symbol(code):
+    symbols = _single_symbols.get(code)
+    if symbols is None:
+        symbols = _single_symbols[code] = ((code, code),)
+    return symbols
+
+def symbols_label(ranges):
+    """Etiqueta legible para un conjunto de rangos de códigos (p. ej. 'a-z|48')."""
+    def fmt(code):
+        ch = chr(code)
+        return ch if code < 128 and ch.isalnum() else str(code)
+    return '|'.join(fmt(low) if low == high else f"{fmt(low)}-{fmt(high)}" for low, high in ranges)
+
+def compute_symbol_classes(positions):
+    """
+    Particiona el alfabeto usado por la gramática en clases de símbolos:
+    dos códigos quedan en la misma clase si pertenecen exactamente a las
+    mismas hojas, por lo que el AFD siempre los trata igual. Anota en cada
+    hoja de símbolo sus clases (node.classes).
+
+    Las hojas guardan sus símbolos como rangos, así que la partición se
+    hace con un barrido sobre los extremos de los rangos, sin enumerar
+    códigos: el costo depende de la cantidad de rangos y no del tamaño
+    del alfabeto.
+
+    Retorna:
+        tuple: (class_of, classes) con class_of = lista ordenada de
+        (desde, hasta, clase) y classes = rangos de cada clase.
+    """
+    # Eventos del barrido: en 'desde' entra el conjunto y en 'hasta + 1' sale
+    eventos = {}
+    for symbols in {node.symbols for node in positions.values() if node.symbols}:
+        for low, high in symbols:
+            eventos.setdefault(low, []).append((symbols, 1))
+            eventos.setdefault(high + 1, []).append((symbols, -1))
+
+    activos = {}
+    class_ids = {}
+    class_of = []
+    classes = []
+    members = {}  # conjunto de símbolos -> clases que cubre
+    puntos = sorted(eventos)
+    for inicio, fin in zip(puntos, puntos[1:]):
+        for symbols, delta in eventos[inicio]:
+            activos[symbols] = activos.get(symbols, 0) + delta
+            if not activos[symbols]:
+                del activos[symbols]
+        if not activos:
+            continue
+        firma = frozenset(activos)
+        clase = class_ids.get(firma)
+        if clase is None:
+            clase = class_ids[firma] = len(classes)
+            classes.append([])
+            for symbols in firma:
+                members.setdefault(symbols, set()).add(clase)
+        if class_of and class_of[-1][2] == clase and class_of[-1][1] == inicio - 1:
+            class_of[-1] = (class_of[-1][0], fin - 1, clase)
+        else:
+            class_of.append((inicio, fin - 1, clase))
+        classes[clase].append((inicio, fin - 1))
+
+    # Las hojas con el mismo conjunto de símbolos comparten también sus clases
+    shared = {symbols: frozenset(ids) for symbols, ids in members.items()}
+    for node in positions.values():
+        if node.symbols:
+            node.classes = shared[node.symbols]
+    return class_of, [normalize_ranges(ranges) for ranges in classes]
+
+def class_ranges(symbol_classes):
+    """
+    Rangos de cada clase a partir del 'symbol_classes' de un AFD: la lista
+    de (desde, hasta, clase), o el diccionario {código: clase} de los AFD
+    anteriores a los rangos.
+    """
+    if isinstance(symbol_classes, dict):
+        symbol_classes = [(code, code, clase) for code, clase in symbol_classes.items()]
+    ranges = {}
+    for low, high, clase in symbol_classes or ():
+        ranges.setdefault(clase, []).append((low, high))
+    return {clase: normalize_ranges(r) for clase, r in ranges.items()}
 
 def is_operator(c):
     return c in {'|', '.', '*', '(', ')', '#'}
@@ -17,17 +115,33 @@ def is_operator(c):
 def is_operand(c):
     return c.isalnum() and not is_operator(c)
 
-def epsilon_closure(state, positions, followpos):
-    closure = set(state)
-    stack = list(state)
-    while stack:
-        pos = stack.pop()
-        symbol = positions[pos].value
-        if symbol == '949':  # es épsilon
-            for fp in followpos.get(pos, set()):
-                if fp not in closure:
-                    closure.add(fp)
-                    stack.append(fp)
+def iter_positions(mask):
+    """Recorre las posiciones (bits encendidos) de una máscara, de menor a mayor."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def epsilon_mask(positions):
+    """Máscara con las posiciones de épsilon explícito ('949')."""
+    mask = 0
+    for pos, node in positions.items():
+        if node.value == '949':
+            mask |= 1 << pos
+    return mask
+
+def epsilon_closure(state, positions, followpos, epsilons=None):
+    if epsilons is None:
+        epsilons = epsilon_mask(positions)
+    closure = state
+    pending = state & epsilons
+    while pending:
+        low = pending & -pending
+        pending ^= low
+        # Lo que sigue a una posición épsilon entra directamente al cierre
+        new = followpos.get(low.bit_length() - 1, 0) & ~closure
+        closure |= new
+        pending |= new & epsilons
     return closure
 
 
@@ -115,9 +229,10 @@ def build_syntax_tree(postfix):
 
         # Si el token es un número (ASCII)
         if token.isdigit():
-            node = Node(token)
+            node = Node(sys.intern(token))
+            if token != '949':  # épsilon: posición sin símbolo, ver epsilon_closure
+                node.symbols = single_symbol(int(token))
             node.position = pos
-            node.firstpos = node.lastpos = {pos}
             node.nullable = False
             positions[pos] = node
             stack.append(node)
@@ -128,7 +243,6 @@ def build_syntax_tree(postfix):
         if token.startswith('#') and token[1:].isdigit():
             node = Node(token)
             node.position = pos
-            node.firstpos = node.lastpos = {pos}
             node.nullable = False
             positions[pos] = node
             stack.append(node)
@@ -139,7 +253,6 @@ def build_syntax_tree(postfix):
         if token == '949':
             node = Node(token)
             node.nullable = True
-            node.firstpos = node.lastpos = set()
             stack.append(node)
             continue
 
@@ -152,21 +265,15 @@ def build_syntax_tree(postfix):
             if token == '*':
                 node = Node('*', child)
                 node.nullable = True
-                node.firstpos = child.firstpos
-                node.lastpos = child.lastpos
 
             elif token == '?':
                 node = Node('|', child, Node('949'))  # A | ε
                 node.nullable = True
-                node.firstpos = child.firstpos | set()
-                node.lastpos = child.lastpos | set()
 
             elif token == '+':
                 node_star = Node('*', child)
                 node = Node('.', child, node_star)
                 node.nullable = child.nullable
-                node.firstpos = child.firstpos
-                node.lastpos = node_star.lastpos
 
             stack.append(node)
             continue
@@ -178,16 +285,28 @@ def build_syntax_tree(postfix):
                 raise ValueError(f"Error: operador '{token}' requiere dos operandos.")
             right = stack.pop()
             left = stack.pop()
+
+            # La unión de dos hojas de símbolo es una sola hoja con ambos
+            # conjuntos: así una clase como ['a'-'z'] ocupa una posición y no 26.
+            if token == '|' and left.symbols and right.symbols:
+                node = Node(None)
+                node.symbols = ranges_union(left.symbols, right.symbols)
+                node.value = symbols_label(node.symbols)
+                node.position = left.position
+                positions[left.position] = node
+                del positions[right.position]
+                # La hoja derecha siempre es la última posición asignada
+                if right.position == pos - 1:
+                    pos -= 1
+                stack.append(node)
+                continue
+
             node = Node(token, left, right)
 
             if token == '|':
                 node.nullable = left.nullable or right.nullable
-                node.firstpos = left.firstpos | right.firstpos
-                node.lastpos = left.lastpos | right.lastpos
             else:  # Concatenación
                 node.nullable = left.nullable and right.nullable
-                node.firstpos = left.firstpos if not left.nullable else left.firstpos | right.firstpos
-                node.lastpos = right.lastpos if not right.nullable else left.lastpos | right.lastpos
 
             stack.append(node)
             continue
@@ -200,50 +319,193 @@ def build_syntax_tree(postfix):
 
     return stack[0], positions
 
+def build_syntax_tree_ast(ast):
+    """
+    Construye el árbol sintáctico con posiciones a partir del árbol de
+    regex_ast que produce Lector.construir_ast, sin pasar por postfix.
+
+    Un subárbol de regex_ast compartido (una definición usada varias
+    veces) se instancia de nuevo en cada aparición, con posiciones propias.
+    'A+' y 'A?' quedan como nodos unarios '+' y '?' sobre A, sin duplicarlo.
+    El recorrido es iterativo y numera las hojas de izquierda a derecha.
+    """
+    positions = {}
+    pos = 1
+    done = []  # Nodos ya construidos, en orden
+    leaves = {}  # CharClass -> (valor, símbolos) de sus hojas
+    stack = [(ast, False)]
+    while stack:
+        item, visited = stack.pop()
+        kind = type(item)
+
+        if kind is CharClass:
+            leaf = leaves.get(item)
+            if leaf is None:
+                ranges = item.ranges
+                if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+                    code = ranges[0][0]
+                    leaf = leaves[item] = (sys.intern(str(code)), single_symbol(code))
+                else:
+                    leaf = leaves[item] = (symbols_label(ranges), ranges)
+            node = Node(leaf[0])
+            node.symbols = leaf[1]
+            node.position = pos
+            positions[pos] = node
+            pos += 1
+            done.append(node)
+            continue
+        if kind is Tag:
+            node = Node(f"#{item.number}")
+            node.position = pos
+            positions[pos] = node
+            pos += 1
+            done.append(node)
+            continue
+        if kind is Epsilon:
+            # Épsilon sin posición: anulable y sin firstpos ni lastpos
+            node = Node('ε')
+            node.nullable = True
+            done.append(node)
+            continue
+
+        if kind is Concat or kind is Alt:
+            children = item.parts if kind is Concat else item.options
+        else:
+            children = (item.child,)
+        if not visited:
+            stack.append((item, True))
+            for child in reversed(children):
+                stack.append((child, False))
+            continue
+
+        nodes = done[len(done) - len(children):]
+        del done[len(done) - len(children):]
+        if kind is Concat or kind is Alt:
+            op = '.' if kind is Concat else '|'
+            node = nodes[0]
+            for right in nodes[1:]:
+                left = node
+                node = Node(op, left, right)
+                if op == '|':
+                    node.nullable = left.nullable or right.nullable
+                else:
+                    node.nullable = left.nullable and right.nullable
+        elif kind is Star:
+            node = Node('*', nodes[0])
+            node.nullable = True
+        elif kind is Plus:
+            node = Node('+', nodes[0])
+            node.nullable = nodes[0].nullable
+        elif kind is Optional:
+            node = Node('?', nodes[0])
+            node.nullable = True
+        else:
+            raise ValueError(f"Nodo de expresión desconocido: {kind.__name__}")
+        done.append(node)
+
+    return done.pop(), positions
+
+def iter_nodes(root):
+    """
+    Recorre el árbol en preorden con una pila explícita, sin recursión, de
+    modo que la cadena de '|' y '.' de la expresión maestra no choca con el
+    límite de recursión de Python.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
 def generate_ast_graph(root):
     dot = graphviz.Digraph('AST')
-    def add_nodes(node, parent_id=None):
-        if node:
-            node_id = str(id(node))
-            label = f"{node.value}"
-            if node.position:
-                label += f" ({node.position})"
-            dot.node(node_id, label)
-            if parent_id:
-                dot.edge(parent_id, node_id)
-            add_nodes(node.left, node_id)
-            add_nodes(node.right, node_id)
-    add_nodes(root)
+    stack = [(root, None)]
+    while stack:
+        node, parent_id = stack.pop()
+        node_id = str(id(node))
+        label = f"{node.value}"
+        if node.position:
+            label += f" ({node.position})"
+        dot.node(node_id, label)
+        if parent_id:
+            dot.edge(parent_id, node_id)
+        for child in (node.right, node.left):
+            if child is not None:
+                stack.append((child, node_id))
+    return dot
+
+def afd_graph(afd_dict, name='AFD'):
+    """
+    Diagrama de un AFD de generate_afd o minimize_afd. Los estados numerados
+    se dibujan con state_label y cada arista lleva los rangos de su clase.
+    """
+    def label(state):
+        return state_label(state) if isinstance(state, int) else state
+
+    class_codes = class_ranges(afd_dict.get('symbol_classes'))
+    accepted = set(afd_dict['accepted'])
+
+    dot = graphviz.Digraph(name)
+    dot.attr(rankdir='LR')
+    # Nodo de inicio invisible
+    dot.node('', shape='none')
+    dot.edge('', label(afd_dict['initial']), label='')
+    for state, trans in afd_dict['transitions'].items():
+        dot.node(label(state), shape='doublecircle' if state in accepted else 'circle')
+        for sym, dest in trans.items():
+            text = symbols_label(class_codes[sym]) if sym in class_codes else str(sym)
+            dot.edge(label(state), label(dest), text)
     return dot
 
 def compute_followpos(root, positions):
-    followpos = {pos: set() for pos in positions}
-    def compute(node):
-        if node:
-            if node.value == '.':
-                for i in node.left.lastpos:
-                    followpos[i] |= node.right.firstpos
-            elif node.value == '*':
-                for i in node.lastpos:
-                    followpos[i] |= node.firstpos
-            compute(node.left)
-            compute(node.right)
-    compute(root)
+    """
+    Calcula followpos con un recorrido postorden iterativo que obtiene de paso
+    firstpos y lastpos de cada subárbol. Esas máscaras se descartan apenas
+    las consume el padre, así que el árbol no guarda una máscara por nodo;
+    solo quedan root.firstpos y root.lastpos, que usa generate_afd.
+    """
+    followpos = {pos: 0 for pos in positions}
+    done = []  # (firstpos, lastpos) de los subárboles ya recorridos
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            stack.append((node, True))
+            if node.right is not None:
+                stack.append((node.right, False))
+            if node.left is not None:
+                stack.append((node.left, False))
+            continue
+
+        if node.left is None:
+            first = last = 1 << node.position if node.position is not None else 0
+        elif node.right is None:
+            # Operadores unarios: '*' y '+' vuelven de lastpos a firstpos, '?' no agrega nada
+            first, last = done.pop()
+            if node.value != '?':
+                for i in iter_positions(last):
+                    followpos[i] |= first
+        else:
+            right_first, right_last = done.pop()
+            left_first, left_last = done.pop()
+            if node.value == '|':
+                first = left_first | right_first
+                last = left_last | right_last
+            else:  # Concatenación
+                for i in iter_positions(left_last):
+                    followpos[i] |= right_first
+                first = left_first | right_first if node.left.nullable else left_first
+                last = left_last | right_last if node.right.nullable else right_last
+        done.append((first, last))
+
+    root.firstpos, root.lastpos = done.pop()
     return followpos
 
 def st_m(texto):
-    partes = []
-    actual = ""
-    for ch in texto:
-        if ch == ' ':
-            if actual:
-                partes.append(actual)
-                actual = ""
-        else:
-            actual += ch
-    if actual:
-        partes.append(actual)
-    return partes
+    return [parte for parte in texto.split(' ') if parte]
 
 def sp_manual(texto):
     inicio = 0
@@ -256,137 +518,196 @@ def sp_manual(texto):
 
     return texto[inicio:fin+1] if inicio <= fin else ''
 
-def generate_afd(root, positions, followpos):
-    import graphviz
-    afd = graphviz.Digraph('AFD')
-    afd.attr(rankdir='LR')
-
-    initial = frozenset(epsilon_closure(root.firstpos, positions, followpos))
-    states = {initial: 'A'}
-    unmarked = [initial]
-    count = 0
-    afd_dict = {'transitions': {}, 'accepted': [], 'initial': 'A', 'states': {}}
+def state_label(state_id):
+    """Nombre legible de un estado para los diagramas: 0 -> 'A', 25 -> 'Z', 26 -> 'AA', ..."""
+    label = ''
+    state_id += 1
+    while state_id:
+        state_id, rest = divmod(state_id - 1, 26)
+        label = chr(ord('A') + rest) + label
+    return label
 
-    # Nodo de inicio invisible
-    afd.node('', shape='none')
-    afd.edge('', 'A', label='')
+def generate_afd(root, positions, followpos):
+    """
+    Construcción por subconjuntos sobre followpos. Retorna solo el
+    diccionario del AFD, con los estados numerados desde 0; el diagrama se
+    dibuja aparte con afd_graph.
+    """
+    # Las transiciones se calculan sobre clases de símbolos, no sobre códigos
+    class_of, classes = compute_symbol_classes(positions)
+
+    # Cada estado del AFD es la máscara de bits de sus posiciones y se
+    # identifica con un entero denso, en el orden en que se descubre
+    epsilons = epsilon_mask(positions)
+    initial = epsilon_closure(root.firstpos, positions, followpos, epsilons)
+    states = {initial: 0}
+    unmarked = deque([initial])
+    afd_dict = {'transitions': {}, 'accepted': [], 'initial': 0, 'states': states,
+                'state_tags': {}, 'symbol_classes': class_of}
 
     # Encontrar posiciones de aceptación (nodos cuyo valor comienza con '#')
-    final_positions = {pos for pos, node in positions.items() if node.value.startswith('#')}
+    final_positions = 0
+    for pos, node in positions.items():
+        if node.value.startswith('#'):
+            final_positions |= 1 << pos
 
     while unmarked:
-        state = unmarked.pop(0)
-        state_name = states[state]
-        afd_dict['states'][state] = state_name
+        state = unmarked.popleft()
+        state_id = states[state]
 
-        # Marcar estado de aceptación
-        if any(p in state for p in final_positions):
-            afd_dict['accepted'].append(state_name)
+        # Marcar estado de aceptación con el tag de menor valor (mayor prioridad)
+        if state & final_positions:
+            afd_dict['accepted'].append(state_id)
+            token_num = min(int(positions[pos].value[1:])
+                            for pos in iter_positions(state & final_positions))
+            afd_dict['state_tags'][state_id] = '#' + str(token_num)
 
         transiciones = {}
-        for pos in state:
-            symbol = positions[pos].value
-            if symbol == '949' or symbol.startswith('#'):
+        for pos in iter_positions(state):
+            node = positions[pos]
+            if not node.classes:
                 continue
-            if symbol not in transiciones:
-                transiciones[symbol] = set()
-            transiciones[symbol] |= followpos[pos]
+            for symbol in node.classes:
+                transiciones[symbol] = transiciones.get(symbol, 0) | followpos[pos]
 
-
-        afd_dict['transitions'][state_name] = {}
+        trans = afd_dict['transitions'][state_id] = {}
         for symbol, next_positions in transiciones.items():
             if not next_positions:
                 continue
-            next_state = frozenset(epsilon_closure(next_positions, positions, followpos))
-            if next_state not in states:
-                count += 1
-                states[next_state] = chr(ord('A') + count)
+            next_state = epsilon_closure(next_positions, positions, followpos, epsilons)
+            next_id = states.get(next_state)
+            if next_id is None:
+                next_id = states[next_state] = len(states)
                 unmarked.append(next_state)
-            afd.edge(state_name, states[next_state], label=str(symbol))
-            afd_dict['transitions'][state_name][symbol] = states[next_state]
-
-    for state_set, name in states.items():
-        shape = 'doublecircle' if name in afd_dict['accepted'] else 'circle'
-        afd.node(name, shape=shape)
-
-    # --- NUEVO: Asignar tags a cada estado aceptante ---
-    state_tags = {}
-    for state_set, name in states.items():
-        # Buscamos nodos hoja que sean tags (que empiezan por '#')
-        token_candidates = [int(positions[pos].value[1:]) 
-                            for pos in state_set if positions[pos].value.startswith('#')]
-        if token_candidates:
-            # Seleccionamos el tag con menor valor (mayor prioridad)
-            token_num = min(token_candidates)
-            state_tags[name] = '#' + str(token_num)
-    afd_dict['state_tags'] = state_tags
-    # -------------------------------------------------------
-
-    return afd, afd_dict
+            trans[symbol] = next_id
+
+    return afd_dict
+
+def hopcroft_partition(afd_dict):
+    """
+    Calcula las clases de estados equivalentes del AFD con el refinamiento de
+    particiones de Hopcroft, en O(n·k·log n).
+
+    La partición inicial separa los estados no aceptantes de los aceptantes,
+    y a estos por su tag, de modo que nunca se fusionan estados que reportan
+    tokens distintos. Las transiciones faltantes se tratan como transiciones
+    a un estado sumidero implícito, que se descarta al final.
+
+    Retorna:
+        list: Grupos de nombres de estados, en el orden en que aparece su
+        primer estado en afd_dict['transitions'].
+    """
+    accepted = set(afd_dict['accepted'])
+    state_tags = afd_dict.get('state_tags', {})
+    nombres = list(afd_dict['transitions'])
+    indices = {nombre: i for i, nombre in enumerate(nombres)}
+    for trans in afd_dict['transitions'].values():
+        for dest in trans.values():
+            if dest not in indices:
+                indices[dest] = len(nombres)
+                nombres.append(dest)
+    sumidero = len(nombres)
+    n = sumidero + 1
+
+    simbolos = sorted({sym for trans in afd_dict['transitions'].values() for sym in trans})
+    # inversas[sym][q] = estados que llegan a q leyendo sym
+    inversas = {sym: {} for sym in simbolos}
+    sin_transicion = {sym: set(range(n)) for sym in simbolos}
+    for q, nombre in enumerate(nombres):
+        for sym, dest in afd_dict['transitions'].get(nombre, {}).items():
+            inversas[sym].setdefault(indices[dest], []).append(q)
+            sin_transicion[sym].discard(q)
+    for sym in simbolos:
+        inversas[sym][sumidero] = list(sin_transicion[sym])
+
+    # Partición inicial: (aceptante, tag)
+    claves = {}
+    bloques = []
+    bloque_de = [0] * n
+    for q in range(n):
+        if q == sumidero:
+            clave = (False, None)
+        else:
+            clave = (nombres[q] in accepted, state_tags.get(nombres[q]))
+        if clave not in claves:
+            claves[clave] = len(bloques)
+            bloques.append(set())
+        bloque_de[q] = claves[clave]
+        bloques[claves[clave]].add(q)
+
+    # Basta con refinar contra todos los bloques menos el más grande
+    mayor = max(range(len(bloques)), key=lambda b: len(bloques[b]))
+    pendientes = {(b, sym) for b in range(len(bloques)) if b != mayor for sym in simbolos}
+
+    while pendientes:
+        divisor, sym = pendientes.pop()
+        inversa = inversas[sym]
+        # Estados que llegan al bloque divisor con sym, agrupados por su bloque
+        tocados = {}
+        for q in bloques[divisor]:
+            for p in inversa.get(q, ()):
+                tocados.setdefault(bloque_de[p], set()).add(p)
+
+        for b, entran in tocados.items():
+            if len(entran) == len(bloques[b]):
+                continue
+            nuevo = len(bloques)
+            bloques[b] -= entran
+            bloques.append(entran)
+            for p in entran:
+                bloque_de[p] = nuevo
+            for c in simbolos:
+                if (b, c) in pendientes:
+                    pendientes.add((nuevo, c))
+                else:
+                    pendientes.add((nuevo, c) if len(entran) <= len(bloques[b]) else (b, c))
+
+    grupos = []
+    for bloque in bloques:
+        estados = sorted(q for q in bloque if q != sumidero)
+        if estados:
+            grupos.append(estados)
+    grupos.sort(key=lambda estados: estados[0])
+    return [[nombres[q] for q in estados] for estados in grupos]
 
 def minimize_afd(afd_dict):
+    """Minimiza el AFD con hopcroft_partition y retorna el diccionario del AFD mínimo (estados M0, M1, ...)."""
     accepted = set(afd_dict['accepted'])
-    groups, min_trans, min_accepted, state_map = {}, {}, set(), {}
-    
-    for state, trans in afd_dict['transitions'].items():
-        tag = afd_dict.get('state_tags', {}).get(state, None)
-        key = (frozenset(trans.items()), state in accepted, tag)
-        groups.setdefault(key, []).append(state)
+    state_tags = afd_dict.get('state_tags', {})
+    groups = hopcroft_partition(afd_dict)
+    names = [f"M{i}" for i in range(len(groups))]
+
+    # Índice directo estado -> estado minimizado
+    block_of = {}
+    for group, name in zip(groups, names):
+        for state in group:
+            block_of[state] = name
+
+    initial = block_of[afd_dict['initial']]
 
-    
-    for i, group in enumerate(groups.values()):
-        name = f"M{i}"
-        state_map[frozenset(group)] = name
-    
-    min_afd = graphviz.Digraph('MinAFD')
-    min_afd.attr(rankdir='LR')
-    min_afd.node("", shape="none")
-    
-    initial_group = next(g for g in state_map if afd_dict['initial'] in g)
-    min_afd.edge("", state_map[initial_group], label="")
-    
     afd_dict_min = {
         'transitions': {},
         'accepted': [],
-        'initial': state_map[initial_group],
+        'initial': initial,
         'states': {},
         # Nuevo: incorporamos los state_tags minimizados
-        'state_tags': {}
+        'state_tags': {},
+        'symbol_classes': afd_dict.get('symbol_classes')
     }
     
-    # Propagar accepted y asignar transiciones mínimas
-    for group, rep in state_map.items():
+    # Una sola pasada por grupo: aceptación, transiciones mínimas y tag.
+    # Todos los estados de un grupo son equivalentes, así que basta con las
+    # transiciones del primero.
+    for group, rep in zip(groups, names):
         if any(s in accepted for s in group):
             afd_dict_min['accepted'].append(rep)
-        afd_dict_min['states'][group] = rep
-        min_trans[rep] = {}
-        original = next(iter(group))
-        for sym, dest in afd_dict['transitions'][original].items():
-            for g, gname in state_map.items():
-                if dest in g:
-                    min_trans[rep][sym] = gname
-                    afd_dict_min['transitions'].setdefault(rep, {})[sym] = gname
-                    break
-    
-    # Nuevo: Propagar los tags desde los estados originales a los estados minimizados.
-    # Se revisa cada grupo y, si algún estado original tenía tag, se lo asigna al estado minimizado.
-    min_state_tags = {}
-    if 'state_tags' in afd_dict:
-        for group, rep in state_map.items():
-            candidate_tags = []
-            for st in group:
-                if st in afd_dict['state_tags']:
-                    candidate_tags.append(afd_dict['state_tags'][st])
-            if candidate_tags:
-                # Seleccionamos el tag con menor valor numérico (prioridad)
-                candidate_tags.sort(key=lambda tag: int(tag[1:]))
-                min_state_tags[rep] = candidate_tags[0]
-    afd_dict_min['state_tags'] = min_state_tags
-    
-    for state, trans in min_trans.items():
-        shape = 'doublecircle' if state in afd_dict_min['accepted'] else 'circle'
-        min_afd.node(state, shape=shape)
-        for sym, dest in trans.items():
-            min_afd.edge(state, dest, sym)
-    
-    return min_afd, afd_dict_min
\ No newline at end of file
+        afd_dict_min['states'][frozenset(group)] = rep
+        afd_dict_min['transitions'][rep] = {sym: block_of[dest]
+                                            for sym, dest in afd_dict['transitions'].get(group[0], {}).items()}
+
+        # Si algún estado original tenía tag, se elige el de menor valor numérico (prioridad)
+        candidate_tags = [state_tags[st] for st in group if st in state_tags]
+        if candidate_tags:
+            afd_dict_min['state_tags'][rep] = min(candidate_tags, key=lambda tag: int(tag[1:]))
+
+    return afd_dict_min
\ No newline at end of file
@@ -1,5 +1,14 @@
 import pickle
 import os
+import sys
+import json
+import mmap
+import argparse
+from array import array
+from collections import Counter, deque
+from afd_directo import symbols_label, class_ranges
+from afd_serializer import MAGIA, leer_cabecera_binaria, leer_tablas_binarias
+from lexer import crear_scanner
 
 def mostrar_info_afd(ruta_pickle):
     """
@@ -7,6 +16,9 @@ def mostrar_info_afd(ruta_pickle):
     - Estado inicial
     - Estados de aceptación
     - Transiciones por estado
+
+    Para una página de las transiciones sin listarlas todas, ver
+    mostrar_transiciones.
     """
     if not os.path.exists(ruta_pickle):
         print(f"❌ El archivo no existe: {ruta_pickle}")
@@ -25,6 +37,13 @@ def mostrar_info_afd(ruta_pickle):
         aceptacion = afd.get('accepted', [])
         print(f"✔️  Estados de aceptación: {', '.join(aceptacion) if aceptacion else 'Ninguno'}")
 
+        # Las transiciones van por clase de símbolos: se listan los rangos de cada una
+        clases = class_ranges(afd.get('symbol_classes'))
+        if clases:
+            print(f"🔤 Clases de símbolos:")
+            for clase, rangos in sorted(clases.items()):
+                print(f"    {clase}: {symbols_label(rangos)}")
+
         transiciones = afd.get('transitions', {})
         print(f"🔁 Transiciones:")
         for estado, trans in transiciones.items():
@@ -33,3 +52,257 @@ def mostrar_info_afd(ruta_pickle):
 
     except Exception as e:
         print(f"❌ Error al mostrar el AFD: {e}")
+
+def cargar_tablas(ruta):
+    """
+    Tablas planas del AFD guardado en 'ruta', sea un artefacto binario
+    (.afdb, mapeado sin copiar) o un .pkl. Retorna un diccionario con
+    'estados', 'alfabeto', 'inicial', 'tabla' (destino por estado * alfabeto
+    + clase), 'clases' (clase por código), 'aceptacion' (índice de token
+    por estado, -1 si no acepta), 'tags' (número de tag por estado, -1 si
+    no acepta o no tiene tag) y 'token_de_tag' (vacío si el archivo no
+    guarda los nombres de los tokens).
+    """
+    with open(ruta, 'rb') as f:
+        binario = f.read(len(MAGIA)) == MAGIA
+        if binario:
+            datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            f.seek(0)
+            afd = pickle.load(f)
+
+    if binario:
+        cabecera = leer_cabecera_binaria(datos)
+        n = cabecera['estados']
+        binarias = leer_tablas_binarias(datos, cabecera)
+        tags = binarias['tags']
+        aceptacion = binarias['aceptacion']
+        desde, hasta = cabecera['secciones']['tokens']
+        tokens = json.loads(datos[desde:hasta].rstrip(b'\0'))
+        return {
+            'estados': n,
+            'alfabeto': cabecera['alfabeto'],
+            'inicial': cabecera['inicial'],
+            'tabla': binarias['tabla'],
+            'clases': binarias['clases'],
+            'aceptacion': aceptacion,
+            'tags': tags,
+            'token_de_tag': {tags[q]: tokens[aceptacion[q]] for q in range(n) if tags[q] >= 0},
+        }
+
+    if not isinstance(afd, dict):
+        raise ValueError("El archivo no contiene un diccionario válido.")
+    scanner = crear_scanner(afd, {})
+    state_tags = afd.get('state_tags', {})
+    tags = array('i', [-1]) * len(scanner.estados)
+    for q, nombre in enumerate(scanner.estados):
+        if scanner.aceptacion[q] >= 0 and nombre in state_tags:
+            tags[q] = int(state_tags[nombre][1:])
+    return {
+        'estados': len(scanner.estados),
+        'alfabeto': scanner.alfabeto,
+        'inicial': scanner.inicial,
+        'tabla': scanner.tabla,
+        'clases': scanner.clases,
+        'aceptacion': scanner.aceptacion,
+        'tags': tags,
+        'token_de_tag': {},
+    }
+
+def resumen_tablas(tablas):
+    """
+    Resume las tablas de cargar_tablas en un diccionario serializable a
+    JSON, recorriéndolas fila por fila: cantidades, cobertura del alfabeto,
+    estados de aceptación por tag (los que no tienen tag, con tag None),
+    histograma de grado de salida, estados muertos (desde los que no se
+    acepta nada) e inalcanzables, y densidad.
+    """
+    n, k = tablas['estados'], tablas['alfabeto']
+    tabla, tags, clases = tablas['tabla'], tablas['tags'], tablas['clases']
+    aceptacion = tablas['aceptacion']
+
+    # Grado de salida y de entrada de cada estado en una sola pasada
+    grados = Counter()
+    entrantes = array('i', [0]) * (n + 1)
+    for q in range(n):
+        grado = 0
+        for d in tabla[q * k:(q + 1) * k]:
+            if d >= 0:
+                grado += 1
+                entrantes[d + 1] += 1
+        grados[grado] += 1
+    transiciones = sum(g * cantidad for g, cantidad in grados.items())
+
+    # Transiciones inversas en formato CSR: origenes[inicio[d]:inicio[d + 1]] llegan a d
+    for q in range(n):
+        entrantes[q + 1] += entrantes[q]
+    origenes = array('i', [0]) * transiciones
+    libre = array('i', entrantes)
+    for q in range(n):
+        for d in tabla[q * k:(q + 1) * k]:
+            if d >= 0:
+                origenes[libre[d]] = q
+                libre[d] += 1
+
+    alcanzables = bytearray(n)
+    alcanzables[tablas['inicial']] = 1
+    pendientes = deque([tablas['inicial']])
+    while pendientes:
+        q = pendientes.popleft()
+        for d in tabla[q * k:(q + 1) * k]:
+            if d >= 0 and not alcanzables[d]:
+                alcanzables[d] = 1
+                pendientes.append(d)
+
+    vivos = bytearray(n)
+    pendientes = deque(q for q in range(n) if aceptacion[q] >= 0)
+    for q in pendientes:
+        vivos[q] = 1
+    while pendientes:
+        d = pendientes.popleft()
+        for q in origenes[entrantes[d]:entrantes[d + 1]]:
+            if not vivos[q]:
+                vivos[q] = 1
+                pendientes.append(q)
+
+    codigos = 0
+    rangos = 0
+    anterior = -1
+    for clase in clases:
+        if clase >= 0:
+            codigos += 1
+            if anterior < 0:
+                rangos += 1
+        anterior = clase
+
+    # Los estados de aceptación salen de 'aceptacion'; los que no tienen tag
+    # van en una fila propia para que el desglose sume el total
+    por_tag = Counter(tags[q] for q in range(n) if aceptacion[q] >= 0)
+    sin_tag = por_tag.pop(-1, 0)
+    return {
+        'estados': n,
+        'transiciones': transiciones,
+        'estado_inicial': tablas['inicial'],
+        'estados_aceptacion': sum(por_tag.values()) + sin_tag,
+        'alfabeto': {'clases': k, 'codigos': codigos, 'rangos': rangos, 'codigo_maximo': len(clases) - 1},
+        'aceptacion_por_tag': [
+            {'tag': f"#{tag}", 'token': tablas['token_de_tag'].get(tag), 'estados': cantidad}
+            for tag, cantidad in sorted(por_tag.items())
+        ] + ([{'tag': None, 'token': None, 'estados': sin_tag}] if sin_tag else []),
+        'histograma_grado_salida': {str(g): cantidad for g, cantidad in sorted(grados.items())},
+        'estados_muertos': n - sum(vivos),
+        'estados_inalcanzables': n - sum(alcanzables),
+        'densidad': transiciones / (n * k) if n * k else 0.0,
+    }
+
+def rangos_de_clases(clases):
+    """Rangos de códigos de cada clase a partir de la tabla 'clases' (clase por código)."""
+    rangos = {}
+    anterior = -1
+    for codigo, clase in enumerate(clases):
+        if clase >= 0:
+            if clase == anterior:
+                rangos[clase][-1][1] = codigo
+            else:
+                rangos.setdefault(clase, []).append([codigo, codigo])
+        anterior = clase
+    return {clase: [tuple(r) for r in lista] for clase, lista in rangos.items()}
+
+def pagina_transiciones(tablas, desde=0, cantidad=100):
+    """
+    Genera (estado, clase, destino) de las filas 'desde' a 'desde + cantidad'
+    de la tabla de cargar_tablas. Solo se leen esas filas: sobre un .afdb
+    mapeado, el resto del artefacto no se toca.
+    """
+    n, k = tablas['estados'], tablas['alfabeto']
+    tabla = tablas['tabla']
+    for q in range(max(0, desde), min(n, desde + cantidad)):
+        for clase, d in enumerate(tabla[q * k:(q + 1) * k]):
+            if d >= 0:
+                yield q, clase, d
+
+def mostrar_transiciones(ruta, desde=0, cantidad=100):
+    """
+    Muestra una página de las transiciones del AFD guardado en 'ruta'
+    (.afdb o .pkl): las de los estados 'desde' a 'desde + cantidad', por
+    id, con las clases de símbolos que usan. Retorna False si no se pudo
+    cargar el archivo.
+    """
+    if not os.path.exists(ruta):
+        print(f"❌ El archivo no existe: {ruta}")
+        return False
+    try:
+        tablas = cargar_tablas(ruta)
+    except Exception as e:
+        print(f"❌ Error al cargar el AFD: {e}")
+        return False
+
+    n, tags = tablas['estados'], tablas['tags']
+    hasta = min(n, desde + cantidad)
+    print(f"✅ AFD cargado desde: {ruta}")
+    print(f"🔁 Transiciones de los estados {desde} a {hasta - 1} (de {n}):")
+    lineas = list(pagina_transiciones(tablas, desde, cantidad))
+    rangos = rangos_de_clases(tablas['clases'])
+    for q, clase, d in lineas:
+        marca = f" (#{tags[d]})" if tags[d] >= 0 else ''
+        print(f"    {q} --{symbols_label(rangos.get(clase, ()))}--> {d}{marca}")
+    if hasta < n:
+        print(f"⏭️ Siguiente página: --transiciones {hasta}")
+    return True
+
+def mostrar_resumen_afd(ruta, como_json=False):
+    """
+    Muestra el resumen de resumen_tablas del AFD guardado en 'ruta' (.afdb
+    o .pkl), sin listar transiciones, o lo imprime como JSON si 'como_json'.
+    Retorna el resumen, o None si no se pudo cargar el archivo.
+    """
+    if not os.path.exists(ruta):
+        print(f"❌ El archivo no existe: {ruta}")
+        return None
+    try:
+        resumen = resumen_tablas(cargar_tablas(ruta))
+    except Exception as e:
+        print(f"❌ Error al resumir el AFD: {e}")
+        return None
+
+    if como_json:
+        print(json.dumps(resumen, indent=2, ensure_ascii=False))
+        return resumen
+
+    alfabeto = resumen['alfabeto']
+    print(f"✅ Resumen del AFD: {ruta}")
+    print(f"🔢 Estados: {resumen['estados']}, transiciones: {resumen['transiciones']}, "
+          f"densidad de la tabla: {resumen['densidad']:.1%}")
+    print(f"➡️  Estado inicial: {resumen['estado_inicial']}")
+    print(f"🔤 Alfabeto: {alfabeto['clases']} clases, {alfabeto['codigos']} códigos en "
+          f"{alfabeto['rangos']} rangos (máximo {alfabeto['codigo_maximo']})")
+    print(f"✔️  Estados de aceptación: {resumen['estados_aceptacion']}")
+    for fila in resumen['aceptacion_por_tag']:
+        token = f" ({fila['token']})" if fila['token'] is not None else ''
+        print(f"    {fila['tag'] or 'sin tag'}{token}: {fila['estados']}")
+    print("📊 Grado de salida (transiciones: estados):")
+    for grado, cantidad in resumen['histograma_grado_salida'].items():
+        print(f"    {grado:>4}: {cantidad}")
+    print(f"💀 Estados muertos: {resumen['estados_muertos']}, "
+          f"inalcanzables: {resumen['estados_inalcanzables']}")
+    return resumen
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecciona un AFD guardado (.pkl o .afdb).")
+    parser.add_argument('ruta', help="archivo del AFD")
+    parser.add_argument('--json', action='store_true', help="imprimir el resumen como JSON")
+    parser.add_argument('--transiciones', nargs='?', type=int, const=0, metavar='DESDE',
+                        help="listar las transiciones a partir del estado DESDE")
+    parser.add_argument('--cantidad', type=int, default=100,
+                        help="estados por página con --transiciones (por defecto 100)")
+    args = parser.parse_args()
+
+    if args.transiciones is not None:
+        if not mostrar_transiciones(args.ruta, args.transiciones, args.cantidad):
+            sys.exit(1)
+    elif mostrar_resumen_afd(args.ruta, args.json) is None:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,268 @@
+from Lector import parse_yal_config, construir_ast
+from afd_directo import (
+    build_syntax_tree_ast,
+    compute_followpos,
+    compute_symbol_classes,
+    epsilon_mask,
+    epsilon_closure,
+    iter_positions,
+    state_label
+)
+from lexer import ScannerCompilado, tabla_de_clases
+
+LIMITE_ESTADOS = 10000
+
+# Marca de transición todavía no calculada en las filas del scanner perezoso
+_PENDIENTE = -2
+
+class ScannerPerezoso(ScannerCompilado):
+    """
+    Scanner que construye el AFD bajo demanda a partir del árbol sintáctico
+    y followpos, sin pasar por generate_afd ni minimize_afd.
+
+    Cada estado del AFD se materializa la primera vez que la entrada lo
+    alcanza, y cada transición se calcula la primera vez que se recorre; a
+    partir de ahí el recorrido es por tabla, igual que ScannerCompilado.
+    Los estados viven en una caché de a lo sumo 'limite_estados' entradas:
+    al llenarse se vacía entera y se sigue desde el estado actual, como
+    hacen los motores de expresiones regulares con AFD perezoso.
+
+    Atributos:
+        mascaras (list): Máscara de posiciones de cada estado materializado, por id.
+        filas (list): Por estado, una lista con el destino de cada clase
+            (-1 sin transición, -2 todavía sin calcular).
+        aceptacion (list): Índice en 'tokens' por estado, -1 si no es de aceptación.
+        tokens (list): Token reportado por cada índice de 'aceptacion'.
+        vaciados (int): Veces que se vació la caché de estados.
+        materializados (int): Estados construidos en total, contando los desalojados.
+    """
+
+    def __init__(self, root, positions, followpos, mapping, limite_estados=LIMITE_ESTADOS):
+        self.positions = positions
+        self.followpos = followpos
+        self.limite_estados = max(2, limite_estados)
+        self.epsilons = epsilon_mask(positions)
+
+        class_of, _ = compute_symbol_classes(positions)
+        self.clases, self.alfabeto = tabla_de_clases(class_of)
+
+        # Posiciones que avanzan con cada clase, para calcular una transición
+        # intersecando máscaras en vez de recorrer todas las hojas del estado
+        self.posiciones_de_clase = [0] * self.alfabeto
+        for pos, node in positions.items():
+            for clase in node.classes or ():
+                self.posiciones_de_clase[clase] |= 1 << pos
+
+        # Cada tag se reporta con el token de su acción; el de menor valor gana
+        self.finales = 0
+        self.tag_de = {}
+        for pos, node in positions.items():
+            if node.value.startswith('#'):
+                self.finales |= 1 << pos
+                self.tag_de[pos] = int(node.value[1:])
+        self.tokens = []
+        self.token_de_tag = {}
+        indices = {}
+        for tag in sorted(set(self.tag_de.values())):
+            token = mapping.get('#' + str(tag), 'UNKNOWN')
+            clave = (type(token), token)
+            if clave not in indices:
+                indices[clave] = len(self.tokens)
+                self.tokens.append(token)
+            self.token_de_tag[tag] = indices[clave]
+
+        self.mascara_inicial = epsilon_closure(root.firstpos, positions, followpos, self.epsilons)
+        self.ids = {}
+        self.mascaras = []
+        self.filas = []
+        self.aceptacion = []
+        self.vaciados = 0
+        self.materializados = 0
+        self.inicial = self._estado(self.mascara_inicial)
+
+    def _estado(self, mascara):
+        """Retorna el id del estado con 'mascara', materializándolo si hace falta."""
+        estado = self.ids.get(mascara)
+        if estado is not None:
+            return estado
+        if len(self.mascaras) >= self.limite_estados:
+            self._vaciar()
+            estado = self.ids.get(mascara)
+            if estado is not None:
+                return estado
+
+        estado = self.ids[mascara] = len(self.mascaras)
+        self.mascaras.append(mascara)
+        self.filas.append([_PENDIENTE] * self.alfabeto)
+        finales = mascara & self.finales
+        if finales:
+            tag = min(self.tag_de[pos] for pos in iter_positions(finales))
+            self.aceptacion.append(self.token_de_tag[tag])
+        else:
+            self.aceptacion.append(-1)
+        self.materializados += 1
+        return estado
+
+    def _vaciar(self):
+        """Vacía la caché de estados, conservando solo el inicial con id 0."""
+        self.ids.clear()
+        # Se vacían en el lugar: el bucle de escaneo guarda referencias a estas listas
+        del self.mascaras[:]
+        del self.filas[:]
+        del self.aceptacion[:]
+        self.vaciados += 1
+        self.inicial = self._estado(self.mascara_inicial)
+
+    def _transicion(self, estado, clase):
+        """Calcula y guarda el destino de 'estado' con 'clase'; -1 si no hay transición."""
+        followpos = self.followpos
+        siguiente = 0
+        for pos in iter_positions(self.mascaras[estado] & self.posiciones_de_clase[clase]):
+            siguiente |= followpos[pos]
+        if not siguiente:
+            self.filas[estado][clase] = -1
+            return -1
+
+        vaciados = self.vaciados
+        mascara = epsilon_closure(siguiente, self.positions, followpos, self.epsilons)
+        destino = self._estado(mascara)
+        # Si la caché se vació, 'estado' ya no existe y no hay fila que completar
+        if self.vaciados == vaciados:
+            self.filas[estado][clase] = destino
+        return destino
+
+    def _escanear(self, cadena, pos=0, final=True, pendiente=None):
+        """Igual que ScannerCompilado._escanear, materializando transiciones al recorrerlas."""
+        filas = self.filas
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        fin_cadena = len(cadena)
+
+        while pos < fin_cadena:
+            estado = self.inicial
+            ultimo_token = -1
+            ultimo_token_pos = pos
+            i = pos
+            while i < fin_cadena:
+                codigo = ord(cadena[i])
+                if codigo >= n_codigos:
+                    break
+                clase = clases[codigo]
+                if clase < 0:
+                    break
+                siguiente = filas[estado][clase]
+                if siguiente == _PENDIENTE:
+                    siguiente = self._transicion(estado, clase)
+                if siguiente < 0:
+                    break
+                estado = siguiente
+                i += 1
+                if aceptacion[estado] >= 0:
+                    ultimo_token = aceptacion[estado]
+                    ultimo_token_pos = i
+            else:
+                if not final:
+                    if pendiente is not None:
+                        pendiente[:] = estado, ultimo_token, ultimo_token_pos
+                    return
+
+            if ultimo_token < 0:
+                yield -1, pos, pos + 1
+                pos += 1
+                continue
+
+            yield ultimo_token, pos, ultimo_token_pos
+            pos = ultimo_token_pos
+
+    def tokenizar_lote(self, entradas):
+        """Igual que ScannerCompilado.tokenizar_lote; las transiciones se materializan en _escanear."""
+        tokens = self.tokens
+        escanear = self._escanear
+        return [[(tokens[indice], cadena[inicio:fin]) for indice, inicio, fin in escanear(cadena) if indice >= 0]
+                for cadena in entradas]
+
+    def _escanear_traza(self, cadena, pos=0, final=True, pendiente=None):
+        """
+        Igual que _escanear, con el recorrido de cada token. Los estados se
+        nombran por su id en la caché, que puede reutilizarse tras vaciarla.
+        """
+        fin_cadena = len(cadena)
+
+        while pos < fin_cadena:
+            estado = self.inicial
+            ultimo_token = -1
+            ultimo_token_pos = pos
+            pasos = []
+            i = pos
+            while i < fin_cadena:
+                codigo = ord(cadena[i])
+                clase = self.clases[codigo] if codigo < len(self.clases) else -1
+                if clase < 0:
+                    break
+                siguiente = self.filas[estado][clase]
+                if siguiente == _PENDIENTE:
+                    siguiente = self._transicion(estado, clase)
+                if siguiente < 0:
+                    break
+                pasos.append((state_label(estado), str(codigo), state_label(siguiente)))
+                estado = siguiente
+                i += 1
+                if self.aceptacion[estado] >= 0:
+                    ultimo_token = self.aceptacion[estado]
+                    ultimo_token_pos = i
+            else:
+                if not final:
+                    if pendiente is not None:
+                        pendiente[:] = estado, ultimo_token, ultimo_token_pos, pasos
+                    return
+
+            if ultimo_token < 0:
+                yield -1, pos, pos + 1, pasos
+                pos += 1
+                continue
+
+            yield ultimo_token, pos, ultimo_token_pos, pasos
+            pos = ultimo_token_pos
+
+    def _continuar(self, cadena, pendiente, desplazamiento):
+        """Igual que ScannerCompilado._continuar, materializando transiciones al recorrerlas."""
+        filas = self.filas
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        estado, ultimo_token, ultimo_token_pos = pendiente[:3]
+        pasos = pendiente[3] if len(pendiente) > 3 else None
+
+        detenido = True
+        for i in range(len(cadena)):
+            codigo = ord(cadena[i])
+            clase = clases[codigo] if codigo < n_codigos else -1
+            if clase < 0:
+                break
+            siguiente = filas[estado][clase]
+            if siguiente == _PENDIENTE:
+                siguiente = self._transicion(estado, clase)
+            if siguiente < 0:
+                break
+            if pasos is not None:
+                pasos.append((state_label(estado), str(codigo), state_label(siguiente)))
+            estado = siguiente
+            if aceptacion[estado] >= 0:
+                ultimo_token = aceptacion[estado]
+                ultimo_token_pos = desplazamiento + i + 1
+        else:
+            detenido = False
+
+        pendiente[:3] = estado, ultimo_token, ultimo_token_pos
+        return detenido
+
+def construir_perezoso(contenido, limite_estados=LIMITE_ESTADOS, alfabeto='imprimible'):
+    """
+    Corre el pipeline sobre el texto de un .yal solo hasta followpos y
+    retorna (scanner, mapping) con un ScannerPerezoso listo para tokenizar.
+    """
+    ast, mapping = construir_ast(parse_yal_config(contenido), alfabeto)
+    root, positions = build_syntax_tree_ast(ast)
+    followpos = compute_followpos(root, positions)
+    return ScannerPerezoso(root, positions, followpos, mapping, limite_estados), mapping
@@ -1,5 +1,12 @@
 import pickle
 import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+
+from lexer import crear_scanner, ScannerCompilado, ScannerBytes
 
 def guardar_afd_pickle(afd_dict, ruta):
     """
@@ -45,4 +52,200 @@ def cargar_afd_pickle(ruta):
         return afd_dict
 
     except Exception as e:
-        raise RuntimeError(f"❌ Error al cargar el AFD: {e}")
\ No newline at end of file
+        raise RuntimeError(f"❌ Error al cargar el AFD: {e}")
+
+# ==== Artefacto binario ====
+# Cabecera de tamaño fijo seguida de secciones alineadas a 8 bytes:
+#   clases      int32[codigos]            clase de cada código, -1 fuera del alfabeto
+#   tabla       int32[estados * alfabeto] destino por (estado, clase), -1 sin transición
+#   aceptacion  int32[estados]            índice en tokens, -1 si no acepta
+#   tags        int32[estados]            número del tag (#1000 -> 1000), -1 si no acepta
+#   tokens      JSON                      nombre del token de cada índice
+#   nombres     JSON                      nombre original de cada estado (solo para la traza)
+# Los enteros de las tablas van en el orden de bytes de la máquina que
+# guardó el artefacto, indicado en la cabecera.
+
+MAGIA = b'AFDB'
+FORMATO_BINARIO = 1
+CABECERA = struct.Struct('<4sIIIIIIIIQQQQQQQ')
+UTF8 = 1
+
+def _alinear(n):
+    return (n + 7) & ~7
+
+def guardar_afd_binario(afd_dict, mapping, ruta):
+    """
+    Guarda el AFD minimizado como artefacto binario versionado: las tablas
+    del scanner en arreglos de tamaño fijo, listos para mapearse con
+    cargar_afd_binario sin reconstruir objetos ni ejecutar código de pickle.
+
+    Parámetros:
+        afd_dict (dict): El AFD minimizado (minimize_afd o cargar_afd_pickle).
+        mapping (dict): Tag -> token de la especificación.
+        ruta (str): Ruta del archivo a escribir.
+    """
+    scanner = crear_scanner(afd_dict, mapping)
+    state_tags = afd_dict.get('state_tags', {})
+    tags = array('i', [-1]) * len(scanner.estados)
+    for i, nombre in enumerate(scanner.estados):
+        if scanner.aceptacion[i] >= 0 and nombre in state_tags:
+            tags[i] = int(state_tags[nombre][1:])
+
+    secciones = [
+        scanner.clases.tobytes(),
+        scanner.tabla.tobytes(),
+        scanner.aceptacion.tobytes(),
+        tags.tobytes(),
+        json.dumps(scanner.tokens).encode('utf-8'),
+        json.dumps([str(nombre) for nombre in scanner.estados]).encode('utf-8'),
+    ]
+    desplazamientos = []
+    posicion = _alinear(CABECERA.size)
+    for seccion in secciones:
+        desplazamientos.append(posicion)
+        posicion = _alinear(posicion + len(seccion))
+    flags = UTF8 if isinstance(scanner, ScannerBytes) else 0
+    cabecera = CABECERA.pack(MAGIA, FORMATO_BINARIO, flags, sys.byteorder == 'little',
+                             len(scanner.estados), scanner.alfabeto, len(scanner.clases), scanner.inicial,
+                             len(scanner.tokens), *desplazamientos, posicion)
+
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(cabecera)
+        for seccion, desde in zip(secciones, desplazamientos):
+            f.write(b'\0' * (desde - f.tell()))
+            f.write(seccion)
+        f.write(b'\0' * (posicion - f.tell()))
+    os.replace(temporal, ruta)
+    print(f"✅ AFD binario guardado exitosamente en: {ruta}")
+
+class _ListaJSON:
+    """Lista guardada como JSON en el artefacto, que se decodifica recién en el primer acceso."""
+
+    def __init__(self, datos, desde, hasta):
+        self._datos = datos
+        self._rango = (desde, hasta)
+        self._lista = None
+
+    def _cargar(self):
+        if self._lista is None:
+            desde, hasta = self._rango
+            self._lista = json.loads(self._datos[desde:hasta].rstrip(b'\0'))
+        return self._lista
+
+    def __getitem__(self, i):
+        return self._cargar()[i]
+
+    def __len__(self):
+        return len(self._cargar())
+
+def leer_cabecera_binaria(datos):
+    """
+    Valida la cabecera de un artefacto binario y la retorna como diccionario
+    con los tamaños y los desplazamientos de cada sección. Rechaza con
+    ValueError un artefacto cuyas secciones no estén en orden dentro del
+    archivo o no alcancen para las cantidades que declara la cabecera.
+    """
+    if len(datos) < CABECERA.size:
+        raise ValueError("❌ El archivo es demasiado corto para ser un AFD binario.")
+    (magia, formato, flags, little, estados, alfabeto, codigos, inicial, n_tokens,
+     *desplazamientos, total) = CABECERA.unpack_from(datos)
+    if magia != MAGIA:
+        raise ValueError("❌ El archivo no es un AFD binario.")
+    if formato != FORMATO_BINARIO:
+        raise ValueError(f"❌ Formato de AFD binario {formato} no soportado (se esperaba {FORMATO_BINARIO}).")
+    if total != len(datos):
+        raise ValueError("❌ El AFD binario está truncado o tiene datos de más.")
+    limites = [_alinear(CABECERA.size)] + desplazamientos + [total]
+    if any(desde > hasta for desde, hasta in zip(limites, limites[1:])):
+        raise ValueError("❌ Las secciones del AFD binario están desordenadas o fuera del archivo.")
+    secciones = dict(zip(('clases', 'tabla', 'aceptacion', 'tags', 'tokens', 'nombres'),
+                         zip(desplazamientos, desplazamientos[1:] + [total])))
+    # Cada tabla int32 tiene que alcanzar para la cantidad que declara la cabecera
+    cantidades = {'clases': codigos, 'tabla': estados * alfabeto, 'aceptacion': estados, 'tags': estados}
+    for nombre, cantidad in cantidades.items():
+        desde, hasta = secciones[nombre]
+        if hasta - desde < 4 * cantidad:
+            raise ValueError(f"❌ La sección '{nombre}' del AFD binario es más corta que lo que indica la cabecera.")
+    if inicial >= estados:
+        raise ValueError("❌ El estado inicial del AFD binario no existe.")
+    return {
+        'flags': flags, 'little': bool(little), 'estados': estados, 'alfabeto': alfabeto,
+        'codigos': codigos, 'inicial': inicial, 'tokens': n_tokens,
+        'secciones': secciones,
+    }
+
+def tabla_binaria(datos, cabecera, nombre, cantidad):
+    """Sección int32 'nombre' del artefacto como memoryview sobre 'datos', sin copiarla."""
+    desde = cabecera['secciones'][nombre][0]
+    vista = memoryview(datos)[desde:desde + 4 * cantidad]
+    if cabecera['little'] == (sys.byteorder == 'little'):
+        return vista.cast('i')
+    # Artefacto de una máquina con otro orden de bytes: se copia y se invierte
+    tabla = array('i', vista)
+    tabla.byteswap()
+    return tabla
+
+def _validar_valores(tabla, nombre, limite):
+    """Verifica que cada valor de la tabla int32 'nombre' sea -1 o un índice menor que 'limite'."""
+    if len(tabla) and (min(tabla) < -1 or max(tabla) >= limite):
+        raise ValueError(f"❌ La sección '{nombre}' del AFD binario tiene valores fuera de rango.")
+
+def leer_tablas_binarias(datos, cabecera):
+    """
+    Retorna las tablas int32 del artefacto ('clases', 'tabla', 'aceptacion'
+    y 'tags') como vistas sobre 'datos', después de verificar que sus
+    valores apunten a clases, estados y tokens existentes: un artefacto
+    con la forma correcta pero valores inválidos se rechaza al cargarlo y
+    no a mitad de un escaneo. La verificación es una pasada de min y max
+    sobre cada tabla, sin copiarla.
+    """
+    n = cabecera['estados']
+    tablas = {
+        'clases': tabla_binaria(datos, cabecera, 'clases', cabecera['codigos']),
+        'tabla': tabla_binaria(datos, cabecera, 'tabla', n * cabecera['alfabeto']),
+        'aceptacion': tabla_binaria(datos, cabecera, 'aceptacion', n),
+        'tags': tabla_binaria(datos, cabecera, 'tags', n),
+    }
+    _validar_valores(tablas['clases'], 'clases', cabecera['alfabeto'])
+    _validar_valores(tablas['tabla'], 'tabla', n)
+    _validar_valores(tablas['aceptacion'], 'aceptacion', cabecera['tokens'])
+    return tablas
+
+def cargar_afd_binario(ruta, clase=None):
+    """
+    Mapea en memoria un artefacto de guardar_afd_binario y retorna el
+    scanner listo para tokenizar (ScannerBytes si el AFD es sobre bytes
+    UTF-8). Las tablas son vistas sobre el mapeo, sin copiarlas: los
+    procesos que cargan el mismo archivo comparten sus páginas, y cargar
+    solo recorre las tablas para validar sus valores (ver
+    leer_tablas_binarias). Al serializarse, el scanner viaja como
+    su ruta (ver ScannerCompilado.artefacto).
+
+    Parámetros:
+        ruta (str): Ruta del artefacto.
+        clase (type): Clase del scanner; por defecto la que indica el artefacto.
+    """
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"❌ El archivo no existe: {ruta}")
+    with open(ruta, 'rb') as f:
+        datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    cabecera = leer_cabecera_binaria(datos)
+
+    if clase is None:
+        clase = ScannerBytes if cabecera['flags'] & UTF8 else ScannerCompilado
+    scanner = clase.__new__(clase)
+    scanner.artefacto = ruta
+    scanner.inicial = cabecera['inicial']
+    scanner.alfabeto = cabecera['alfabeto']
+    tablas = leer_tablas_binarias(datos, cabecera)
+    scanner.clases = tablas['clases']
+    scanner.tabla = tablas['tabla']
+    scanner.aceptacion = tablas['aceptacion']
+    desde, hasta = cabecera['secciones']['tokens']
+    scanner.tokens = json.loads(datos[desde:hasta].rstrip(b'\0'))
+    if len(scanner.tokens) != cabecera['tokens']:
+        raise ValueError("❌ La cantidad de tokens del AFD binario no coincide con la cabecera.")
+    scanner.estados = _ListaJSON(datos, *cabecera['secciones']['nombres'])
+    return scanner
+
@@ -0,0 +1,53 @@
+"""
+Escalado de las etapas del front end sobre especificaciones .yal sintéticas
+de tamaño creciente, hasta varios megabytes.
+
+Cada etapa se mide por separado sobre la salida de la anterior. Si todas son
+lineales, la columna µs/KB se mantiene aproximadamente constante al crecer
+la especificación.
+
+Uso:
+    python -m benchmarks.bench_frontend [KB1 KB2 ...]
+"""
+import random
+import sys
+
+from Lector import remove_comments, parse_yal_config, combine_expressions, construir_ast
+from shunting import shunting_yard, st_manual
+from afd_directo import build_syntax_tree_ast
+from benchmarks.comun import generar_yal_palabras, cronometrar
+
+def generar_yal_kb(kb, semilla=0):
+    """Especificación de al menos 'kb' kilobytes: palabras clave con comentarios intercalados."""
+    rnd = random.Random(semilla)
+    texto = generar_yal_palabras(max(1, kb * 1024 // 40), semilla)
+    lineas = []
+    for linea in texto.split('\n'):
+        lineas.append(linea)
+        if linea.startswith('  |') and rnd.random() < 0.2:
+            lineas.append("    (* comentario entre reglas *)")
+    return '\n'.join(lineas)
+
+def main():
+    tamanos = [int(n) for n in sys.argv[1:]] or [256, 512, 1024, 2048]
+    etapas = ['comentarios', 'parseo', 'combinar', 'shunting', 'split', 'ast']
+    print(f"{'KB':>6} " + ' '.join(f"{etapa:>12}" for etapa in etapas) + f" {'µs/KB (total)':>14}")
+    for kb in tamanos:
+        texto = generar_yal_kb(kb)
+        config = parse_yal_config(texto)
+        master_expr, _ = combine_expressions(config)
+        postfix = shunting_yard(master_expr)
+        tiempos = [
+            cronometrar(lambda: remove_comments(texto), 1),
+            cronometrar(lambda: parse_yal_config(texto), 1),
+            cronometrar(lambda: combine_expressions(config), 1),
+            cronometrar(lambda: shunting_yard(master_expr), 1),
+            cronometrar(lambda: st_manual(postfix), 1),
+            cronometrar(lambda: build_syntax_tree_ast(construir_ast(config)[0]), 1),
+        ]
+        real_kb = len(texto) / 1024
+        print(f"{real_kb:>6.0f} " + ' '.join(f"{t:>12.3f}" for t in tiempos)
+              + f" {sum(tiempos) / real_kb * 1e6:>14.1f}")
+
+if __name__ == '__main__':
+    main()
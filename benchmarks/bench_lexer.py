@@ -0,0 +1,47 @@
+"""
+Throughput de lexer.lexer con y sin diagnósticos.
+
+Mide por separado el camino de producción (sin diagnóstico), el log a
+archivo y la traza completa de estados, para que el costo del modo de
+depuración no se confunda con el del escaneo.
+
+Uso:
+    python -m benchmarks.bench_lexer [spec.yal] [tamano_en_caracteres]
+"""
+import os
+import sys
+import tempfile
+
+from lexer import lexer, ScannerCompilado, DiagnosticoArchivo, DiagnosticoTraza
+from benchmarks.comun import compilar_spec, generar_entrada, cronometrar
+
+def main():
+    ruta_yal = sys.argv[1] if len(sys.argv) > 1 else 'slr-2.yal'
+    tamano = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    afd_dict, mapping = compilar_spec(ruta_yal)
+    scanner = ScannerCompilado(afd_dict, mapping)
+    entrada = generar_entrada(tamano)
+    cantidad = len(lexer(entrada, scanner, mapping))
+    ruta_log = os.path.join(tempfile.gettempdir(), 'bench_lexer_logs.txt')
+
+    def con_log():
+        diagnostico = DiagnosticoArchivo(ruta_log)
+        lexer(entrada, scanner, mapping, diagnostico=diagnostico)
+        diagnostico.cerrar()
+
+    modos = [
+        ('sin diagnóstico', lambda: lexer(entrada, scanner, mapping)),
+        ('log a archivo', con_log),
+        ('traza de estados', lambda: lexer(entrada, scanner, mapping, diagnostico=DiagnosticoTraza())),
+    ]
+
+    print(f"{ruta_yal}: {len(entrada)} caracteres, {cantidad} tokens")
+    for nombre, funcion in modos:
+        segundos = cronometrar(funcion)
+        print(f"  {nombre:<18} {segundos:8.3f} s  "
+              f"{len(entrada) / segundos / 1e6:7.2f} Mcar/s  {cantidad / segundos / 1e6:7.2f} Mtok/s")
+    os.remove(ruta_log)
+
+if __name__ == '__main__':
+    main()
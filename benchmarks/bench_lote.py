@@ -0,0 +1,53 @@
+"""
+Muchas entradas cortas: lexer.lexer por entrada contra lexer_lote.
+
+'lexer por entrada' es el uso ingenuo, que pasa el diccionario del AFD en
+cada llamada y reconstruye el scanner cada vez; 'lexer + scanner' reutiliza
+un scanner ya construido. Los modos de lexer_lote construyen el scanner una
+vez y lo reparten, según el caso, entre hilos o procesos.
+
+Uso:
+    python -m benchmarks.bench_lote [spec.yal] [cantidad_de_entradas]
+"""
+import os
+import random
+import sys
+
+from lexer import lexer, crear_scanner
+from lexer_paralelo import lexer_lote
+from benchmarks.comun import compilar_spec, generar_entrada, cronometrar
+
+def generar_entradas(cantidad, semilla=0):
+    """Entradas cortas, de 5 a 80 caracteres, como expresiones o valores de configuración."""
+    rnd = random.Random(semilla)
+    return [generar_entrada(rnd.randint(5, 80), semilla=rnd.random()) for _ in range(cantidad)]
+
+def main():
+    ruta_yal = sys.argv[1] if len(sys.argv) > 1 else 'slr-2.yal'
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    afd_dict, mapping = compilar_spec(ruta_yal)
+    scanner = crear_scanner(afd_dict, mapping)
+    entradas = generar_entradas(cantidad)
+    esperado = [lexer(entrada, scanner, mapping) for entrada in entradas]
+    tokens = sum(len(t) for t in esperado)
+    procesos = os.cpu_count() or 1
+
+    modos = [
+        ('lexer por entrada', lambda: [lexer(e, afd_dict, mapping) for e in entradas]),
+        ('lexer + scanner', lambda: [lexer(e, scanner, mapping) for e in entradas]),
+        ('lote', lambda: list(lexer_lote(entradas, scanner, mapping))),
+        ('lote, 4 hilos', lambda: list(lexer_lote(entradas, scanner, mapping, hilos=4))),
+        (f'lote, {procesos} procesos', lambda: list(lexer_lote(entradas, scanner, mapping, procesos=procesos))),
+    ]
+
+    print(f"{ruta_yal}: {cantidad} entradas, {tokens} tokens, {procesos} CPU")
+    print(f"  {'modo':<20} {'tiempo (s)':>10} {'entradas/s':>12} {'tokens/s':>12}")
+    for nombre, funcion in modos:
+        if funcion() != esperado:
+            raise AssertionError(f"{nombre} no coincide con lexer.lexer")
+        segundos = cronometrar(funcion)
+        print(f"  {nombre:<20} {segundos:>10.3f} {cantidad / segundos:>12.0f} {tokens / segundos:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Memoria del árbol sintáctico (build_syntax_tree_ast).
+
+Cada especificación se mide en un subproceso limpio que construye ahí
+mismo el árbol de expresiones (sin cargarlo de un archivo, que dejaría el
+RSS máximo por encima del árbol) y luego el árbol sintáctico. Se reportan
+dos cifras:
+  - RSS máx. extra: lo que sube ru_maxrss al construir el árbol. Si el
+    árbol cabe debajo del máximo que ya dejó el parser, es 0.
+  - asignado: el pico de memoria asignada con tracemalloc, en una segunda
+    construcción aparte para que tracemalloc no infle el RSS.
+
+Uso:
+    python -m benchmarks.bench_memoria [cantidad_de_reglas_sintéticas]
+"""
+import contextlib
+import gc
+import io
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from Lector import leer_archivo, parse_yal_config, construir_ast
+from afd_directo import build_syntax_tree_ast, iter_nodes
+from benchmarks.comun import generar_yal_palabras
+
+SPECS = ['slr-1.yal', 'slr-2.yal', 'slr-3.yal', 'slr-4.yal', 'test.yal']
+
+def ast_de(texto):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return construir_ast(parse_yal_config(texto))[0]
+
+def medir_arbol(fuente):
+    """
+    Se ejecuta en el subproceso: 'fuente' es la ruta de un .yal o la
+    cantidad de reglas de una especificación sintética. Reporta el aumento
+    del RSS máximo y el pico asignado al construir el árbol.
+    """
+    texto = generar_yal_palabras(int(fuente)) if fuente.isdigit() else leer_archivo(fuente)
+    ast = ast_de(texto)
+    del texto
+    gc.collect()
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    root, positions = build_syntax_tree_ast(ast)
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    nodos = sum(1 for _ in iter_nodes(root))
+    cantidad = len(positions)
+    del root, positions
+    gc.collect()
+
+    tracemalloc.start()
+    build_syntax_tree_ast(ast)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({'posiciones': cantidad, 'nodos': nodos, 'rss_kb': rss_kb, 'asignado_kb': pico // 1024}))
+
+def medir(nombre, fuente):
+    salida = subprocess.check_output([sys.executable, '-m', 'benchmarks.bench_memoria', '--medir', fuente])
+    datos = json.loads(salida)
+    print(f"{nombre:<22} {datos['posiciones']:>10} {datos['nodos']:>10} "
+          f"{datos['rss_kb'] / 1024:>18.1f} {datos['asignado_kb']:>14}")
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--medir':
+        medir_arbol(sys.argv[2])
+        return
+    reglas = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print(f"{'especificación':<22} {'posiciones':>10} {'nodos':>10} {'RSS máx. extra (MB)':>18} {'asignado (KB)':>14}")
+    for ruta in SPECS:
+        medir(ruta, ruta)
+    medir(f"sintética {reglas} reglas", str(reglas))
+
+if __name__ == '__main__':
+    main()
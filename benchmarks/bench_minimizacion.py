@@ -0,0 +1,27 @@
+"""
+Escalado de minimize_afd sobre gramáticas generadas con miles de estados.
+
+Cada gramática tiene N palabras clave aleatorias (ver generar_yal_palabras).
+Con el índice estado -> bloque, el tiempo por estado debería mantenerse
+aproximadamente constante al crecer el AFD.
+
+Uso:
+    python -m benchmarks.bench_minimizacion [N1 N2 ...]
+"""
+import sys
+
+from afd_directo import minimize_afd
+from benchmarks.comun import generar_yal_palabras, compilar_texto_hasta_afd, cronometrar
+
+def main():
+    tamanos = [int(n) for n in sys.argv[1:]] or [100, 200, 400, 800]
+    print(f"{'palabras':>9} {'estados':>8} {'min':>8} {'tiempo (s)':>11} {'µs/estado':>10}")
+    for cantidad in tamanos:
+        afd_dict, _ = compilar_texto_hasta_afd(generar_yal_palabras(cantidad))
+        estados = len(afd_dict['transitions'])
+        minimos = len(minimize_afd(afd_dict)['transitions'])
+        segundos = cronometrar(lambda: minimize_afd(afd_dict))
+        print(f"{cantidad:>9} {estados:>8} {minimos:>8} {segundos:>11.4f} {segundos / estados * 1e6:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Tokenizar un archivo grande leyéndolo entero contra mapearlo en memoria.
+
+'lectura' es el camino de main: open(...).read() y lexer.lexer, que
+materializa la cadena decodificada y un lexema por token. 'mmap' usa
+lexer_mmap, que recorre el archivo mapeado y solo genera spans
+(token, inicio, fin). Cada modo corre en un subproceso limpio para que el
+RSS máximo sea solo suyo.
+
+Uso:
+    python -m benchmarks.bench_mmap [spec.yal] [megabytes]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from lexer import lexer, lexer_mmap
+from benchmarks.comun import compilar_spec, generar_entrada
+
+def medir_modo(modo, ruta_yal, ruta_entrada):
+    """Se ejecuta en el subproceso: tokeniza la entrada y reporta tiempo, tokens y RSS máximo."""
+    afd_dict, mapping = compilar_spec(ruta_yal)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    if modo == 'lectura':
+        with open(ruta_entrada, encoding='utf-8') as f:
+            cantidad = len(lexer(f.read(), afd_dict, mapping))
+    else:
+        cantidad = sum(1 for _ in lexer_mmap(ruta_entrada, afd_dict, mapping))
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'segundos': segundos, 'tokens': cantidad, 'rss_kb': pico - base}))
+
+def main():
+    if len(sys.argv) > 4 and sys.argv[1] == '--medir':
+        medir_modo(*sys.argv[2:5])
+        return
+    ruta_yal = sys.argv[1] if len(sys.argv) > 1 else 'slr-2.yal'
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        bloque = generar_entrada(1 << 20)
+        for _ in range(megabytes):
+            f.write(bloque)
+    try:
+        print(f"{ruta_yal}: {os.path.getsize(f.name) / 1e6:.1f} MB")
+        print(f"  {'modo':<8} {'tiempo (s)':>10} {'tokens':>10} {'Mtok/s':>8} {'RSS extra (MB)':>15}")
+        for modo in ('lectura', 'mmap'):
+            salida = subprocess.check_output(
+                [sys.executable, '-m', 'benchmarks.bench_mmap', '--medir', modo, ruta_yal, f.name])
+            datos = json.loads(salida)
+            print(f"  {modo:<8} {datos['segundos']:>10.3f} {datos['tokens']:>10} "
+                  f"{datos['tokens'] / datos['segundos'] / 1e6:>8.2f} {datos['rss_kb'] / 1024:>15.1f}")
+    finally:
+        os.remove(f.name)
+
+if __name__ == '__main__':
+    main()
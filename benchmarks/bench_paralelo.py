@@ -0,0 +1,46 @@
+"""
+Lexer secuencial sobre un archivo mapeado contra lexer_paralelo con
+distintas cantidades de procesos.
+
+Antes de medir se verifica que cada configuración produzca exactamente
+los mismos spans que lexer_mmap. La aceleración depende de los núcleos
+disponibles: con un solo núcleo el modo paralelo solo agrega el costo de
+repartir y unir los trozos.
+
+Uso:
+    python -m benchmarks.bench_paralelo [spec.yal] [megabytes] [P1 P2 ...]
+"""
+import os
+import sys
+import tempfile
+
+from lexer import lexer_mmap
+from lexer_paralelo import lexer_paralelo
+from benchmarks.comun import compilar_spec, generar_entrada, cronometrar
+
+def main():
+    ruta_yal = sys.argv[1] if len(sys.argv) > 1 else 'slr-2.yal'
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    procesos = [int(n) for n in sys.argv[3:]] or [2, 4, os.cpu_count() or 1]
+
+    afd_dict, mapping = compilar_spec(ruta_yal)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        bloque = generar_entrada(1 << 20)
+        for _ in range(megabytes):
+            f.write(bloque)
+    try:
+        esperado = list(lexer_mmap(f.name, afd_dict, mapping))
+        print(f"{ruta_yal}: {os.path.getsize(f.name) / 1e6:.1f} MB, {len(esperado)} tokens, "
+              f"{os.cpu_count()} CPU")
+        secuencial = cronometrar(lambda: sum(1 for _ in lexer_mmap(f.name, afd_dict, mapping)), 1)
+        print(f"  {'secuencial':<14} {secuencial:8.3f} s")
+        for cantidad in sorted(set(procesos)):
+            if list(lexer_paralelo(f.name, afd_dict, mapping, cantidad)) != esperado:
+                raise AssertionError(f"lexer_paralelo con {cantidad} procesos no coincide con lexer_mmap")
+            segundos = cronometrar(lambda: sum(1 for _ in lexer_paralelo(f.name, afd_dict, mapping, cantidad)), 1)
+            print(f"  {f'{cantidad} procesos':<14} {segundos:8.3f} s  x{secuencial / segundos:.2f}")
+    finally:
+        os.remove(f.name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+AFD completo contra AFD perezoso sobre gramáticas de N palabras clave.
+
+El AFD completo paga la construcción por subconjuntos y la minimización de
+todos los estados antes de tokenizar; el perezoso solo construye árbol y
+followpos y materializa los estados que la entrada visita. La entrada usa
+unas pocas palabras de la gramática, como un programa real usa una
+fracción pequeña de las reglas.
+
+Uso:
+    python -m benchmarks.bench_perezoso [N1 N2 ...]
+"""
+import random
+import re
+import sys
+import time
+
+from afd_directo import minimize_afd
+from afd_lazy import construir_perezoso
+from lexer import ScannerCompilado
+from benchmarks.comun import generar_yal_palabras, compilar_texto_hasta_afd, cronometrar
+
+def generar_entrada_palabras(texto, cantidad=2000, distintas=50, semilla=0):
+    """Entrada con 'cantidad' palabras tomadas de 'distintas' palabras clave del .yal."""
+    rnd = random.Random(semilla)
+    palabras = re.findall(r'"(\w+)"', texto)
+    usadas = rnd.sample(palabras, min(distintas, len(palabras)))
+    return ' '.join(rnd.choice(usadas) for _ in range(cantidad))
+
+def main():
+    tamanos = [int(n) for n in sys.argv[1:]] or [500, 1000, 2000, 4000]
+    print(f"{'palabras':>9} {'completo (s)':>13} {'perezoso (s)':>13} "
+          f"{'escaneo (s)':>12} {'perezoso (s)':>13} {'estados':>8} {'visitados':>10}")
+    for cantidad in tamanos:
+        texto = generar_yal_palabras(cantidad)
+        entrada = generar_entrada_palabras(texto)
+
+        inicio = time.perf_counter()
+        afd_dict, mapping = compilar_texto_hasta_afd(texto)
+        scanner = ScannerCompilado(minimize_afd(afd_dict), mapping)
+        completo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        perezoso, _ = construir_perezoso(texto)
+        arranque = time.perf_counter() - inicio
+
+        # La primera pasada del perezoso incluye materializar los estados
+        if perezoso.tokenizar(entrada) != scanner.tokenizar(entrada):
+            raise AssertionError("el AFD perezoso no coincide con el completo")
+        escaneo = cronometrar(lambda: scanner.tokenizar(entrada))
+        escaneo_perezoso = cronometrar(lambda: perezoso.tokenizar(entrada))
+
+        print(f"{cantidad:>9} {completo:>13.3f} {arranque:>13.3f} {escaneo:>12.4f} "
+              f"{escaneo_perezoso:>13.4f} {len(afd_dict['transitions']):>8} {perezoso.materializados:>10}")
+
+if __name__ == '__main__':
+    main()
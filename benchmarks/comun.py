@@ -0,0 +1,80 @@
+"""
+Utilidades compartidas por los benchmarks: compilación silenciosa de una
+especificación .yal y generación de entradas sintéticas.
+
+Los benchmarks se ejecutan desde la raíz del repositorio, por ejemplo:
+    python -m benchmarks.bench_lexer
+"""
+import contextlib
+import io
+import random
+import time
+
+from Lector import leer_archivo, parse_yal_config, construir_ast
+from afd_directo import build_syntax_tree_ast, compute_followpos, generate_afd, minimize_afd
+
+FRAGMENTOS = ['abc', 'x1', 'total', '12', '3.75', '6E+2', '+', '-', '*', '/', '(', ')', ' ', ' ', '\n']
+
+def compilar_spec(ruta_yal):
+    """Compila un .yal sin imprimir nada y retorna (afd_dict_min, mapping)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, mapping = construir_ast(parse_yal_config(leer_archivo(ruta_yal)))
+        root, positions = build_syntax_tree_ast(ast)
+        followpos = compute_followpos(root, positions)
+        afd_dict = generate_afd(root, positions, followpos)
+        afd_dict_min = minimize_afd(afd_dict)
+    return afd_dict_min, mapping
+
+def generar_entrada(tamano, semilla=0):
+    """Genera una entrada de aproximadamente 'tamano' caracteres con tokens de slr-*.yal."""
+    rnd = random.Random(semilla)
+    partes = []
+    total = 0
+    while total < tamano:
+        fragmento = rnd.choice(FRAGMENTOS)
+        partes.append(fragmento)
+        total += len(fragmento)
+    return ''.join(partes)
+
+def cronometrar(funcion, repeticiones=3):
+    """Retorna el mejor tiempo (en segundos) de 'repeticiones' llamadas a 'funcion'."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        if mejor is None or transcurrido < mejor:
+            mejor = transcurrido
+    return mejor
+
+def generar_yal_palabras(cantidad, semilla=0):
+    """
+    Genera una especificación .yal con 'cantidad' palabras clave aleatorias
+    más identificadores y espacios. El AFD resultante tiene del orden de
+    varios estados por palabra, lo que sirve para medir cómo escala la
+    construcción con miles de estados.
+    """
+    rnd = random.Random(semilla)
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    palabras = set()
+    while len(palabras) < cantidad:
+        palabras.add(''.join(rnd.choice(letras) for _ in range(rnd.randint(4, 9))))
+    lineas = [
+        "let delim = [' ''\\t''\\n']",
+        "let ws = delim+",
+        "",
+        "rule tokens =",
+        "    ws        { return WHITESPACE }",
+    ]
+    for i, palabra in enumerate(sorted(palabras)):
+        lineas.append(f"  | \"{palabra}\"   {{ return KW{i} }}")
+    return '\n'.join(lineas) + '\n'
+
+def compilar_texto_hasta_afd(texto):
+    """Corre el pipeline sobre el texto de un .yal hasta generate_afd y retorna (afd_dict, mapping)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, mapping = construir_ast(parse_yal_config(texto))
+        root, positions = build_syntax_tree_ast(ast)
+        followpos = compute_followpos(root, positions)
+        afd_dict = generate_afd(root, positions, followpos)
+    return afd_dict, mapping
@@ -0,0 +1,246 @@
+"""
+Suite de benchmarks de punta a punta: cada etapa del compilador sobre las
+especificaciones incluidas y sobre especificaciones sintéticas grandes, y
+el throughput del lexer sobre entradas de tamaño creciente.
+
+Cada medición guarda el mejor tiempo de varias repeticiones y el pico de
+memoria asignada (tracemalloc, en una pasada aparte para no distorsionar
+el tiempo). Los resultados se escriben como JSON; el modo --comparar
+contrasta dos corridas y reporta las regresiones.
+
+Uso:
+    python -m benchmarks.suite [--salida resultados.json] [--tamanos KB ...] [--palabras N ...]
+    python -m benchmarks.suite --tamanos 1024 102400 512000   (hasta 500 MB; lexer.lexer solo hasta 16 MB)
+    python -m benchmarks.suite --comparar base.json nuevo.json [--umbral 0.10]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+
+from Lector import leer_archivo, parse_yal_config, combine_expressions, construir_ast
+from shunting import shunting_yard, limpiar_postfix
+from afd_directo import (
+    build_syntax_tree,
+    build_syntax_tree_ast,
+    compute_followpos,
+    generate_afd,
+    minimize_afd,
+    st_m
+)
+from lexer import lexer, lexer_stream, lexer_mmap, crear_scanner
+from benchmarks.comun import generar_yal_palabras, generar_entrada, cronometrar
+
+FORMATO_RESULTADOS = 1
+SPECS = ['slr-1.yal', 'slr-2.yal', 'slr-3.yal', 'slr-4.yal', 'test.yal']
+# Tamaños de entrada del lexer, en KB
+TAMANOS = [1, 100, 1024, 10 * 1024]
+# Por encima de este tamaño lexer.lexer no se mide: la lista de tokens no entra en memoria
+LIMITE_LISTA_KB = 16 * 1024
+# Tiempos menores que este (en segundos) son ruido al comparar corridas
+MINIMO_SEGUNDOS = 0.001
+
+def pico_memoria(funcion):
+    """Pico de memoria asignada (KB) durante una llamada a 'funcion'."""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico // 1024
+
+def medir(funcion, repeticiones, memoria=True):
+    """Retorna {'segundos', 'memoria_kb'} de 'funcion'; memoria_kb es None si no se mide."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        segundos = cronometrar(funcion, repeticiones)
+        kb = pico_memoria(funcion) if memoria else None
+    return {'segundos': segundos, 'memoria_kb': kb}
+
+def postfix_legado(master_expr):
+    """Postfix del pipeline de cadenas, con la limpieza que necesitan algunas especificaciones."""
+    postfix = shunting_yard(master_expr)
+    try:
+        build_syntax_tree(st_m(postfix))
+        return postfix
+    except ValueError:
+        return limpiar_postfix(postfix)
+
+def medir_etapas(nombre, texto, repeticiones, memoria):
+    """Mide cada etapa del compilador sobre 'texto', alimentándola con la salida de la anterior."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        config = parse_yal_config(texto)
+        master_expr, _ = combine_expressions(config)
+        postfix = postfix_legado(master_expr)
+        ast, _ = construir_ast(config)
+        root, positions = build_syntax_tree_ast(ast)
+        followpos = compute_followpos(root, positions)
+        afd_dict = generate_afd(root, positions, followpos)
+
+    etapas = [
+        ('parse_yal_config', lambda: parse_yal_config(texto)),
+        ('combine_expressions', lambda: combine_expressions(config)),
+        ('shunting_yard', lambda: shunting_yard(master_expr)),
+        ('build_syntax_tree', lambda: build_syntax_tree(st_m(postfix))),
+        ('construir_ast', lambda: construir_ast(config)),
+        ('build_syntax_tree_ast', lambda: build_syntax_tree_ast(ast)),
+        ('compute_followpos', lambda: compute_followpos(root, positions)),
+        ('generate_afd', lambda: generate_afd(root, positions, followpos)),
+        ('minimize_afd', lambda: minimize_afd(afd_dict)),
+    ]
+    resultados = []
+    for etapa, funcion in etapas:
+        resultado = {'grupo': 'etapas', 'spec': nombre, 'etapa': etapa}
+        resultado.update(medir(funcion, repeticiones, memoria))
+        resultados.append(resultado)
+        print(f"  {nombre:<22} {etapa:<22} {resultado['segundos']:>10.4f} s "
+              f"{_kb(resultado['memoria_kb']):>12}", file=sys.stderr)
+    resultados.append({'grupo': 'etapas', 'spec': nombre, 'etapa': 'estados',
+                       'estados': len(afd_dict['transitions'])})
+    return resultados
+
+def medir_lexer(ruta_yal, tamanos, repeticiones, memoria):
+    """Throughput de lexer.lexer, lexer_stream y lexer_mmap sobre entradas de 'tamanos' KB."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, mapping = construir_ast(parse_yal_config(leer_archivo(ruta_yal)))
+        root, positions = build_syntax_tree_ast(ast)
+        afd_dict_min = minimize_afd(generate_afd(root, positions, compute_followpos(root, positions)))
+    scanner = crear_scanner(afd_dict_min, mapping)
+
+    resultados = []
+    for kb in tamanos:
+        # Las entradas grandes se generan repitiendo un bloque de 1 MB
+        bloque = generar_entrada(min(kb, 1024) * 1024)
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+            for _ in range(max(1, kb // 1024)):
+                f.write(bloque)
+        try:
+            tamano = os.path.getsize(f.name)
+            modos = [
+                ('lexer_stream', lambda: _consumir_archivo(f.name, scanner, mapping)),
+                ('lexer_mmap', lambda: _consumir(lexer_mmap(f.name, scanner, mapping))),
+            ]
+            if kb <= LIMITE_LISTA_KB:
+                entrada = leer_archivo(f.name)
+                modos.insert(0, ('lexer', lambda: lexer(entrada, scanner, mapping)))
+            for modo, funcion in modos:
+                resultado = {'grupo': 'lexer', 'spec': ruta_yal, 'modo': modo, 'bytes': tamano}
+                # Los modos en streaming usan memoria constante: medirla solo agrega tiempo
+                resultado.update(medir(funcion, repeticiones, memoria and modo == 'lexer'))
+                resultado['mb_s'] = tamano / resultado['segundos'] / 1e6
+                resultados.append(resultado)
+                print(f"  {ruta_yal:<10} {modo:<13} {tamano / 1e6:>9.2f} MB {resultado['segundos']:>9.3f} s "
+                      f"{resultado['mb_s']:>7.2f} MB/s {_kb(resultado['memoria_kb']):>12}", file=sys.stderr)
+        finally:
+            os.remove(f.name)
+    return resultados
+
+def _consumir(iterable):
+    cantidad = 0
+    for _ in iterable:
+        cantidad += 1
+    return cantidad
+
+def _consumir_archivo(ruta, scanner, mapping):
+    with open(ruta, encoding='utf-8') as f:
+        return _consumir(lexer_stream(f, scanner, mapping))
+
+def _kb(kb):
+    return '' if kb is None else f"{kb} KB"
+
+def clave(resultado):
+    """Identifica una medición entre corridas distintas."""
+    return (resultado['grupo'], resultado['spec'], resultado.get('etapa') or resultado.get('modo'),
+            resultado.get('bytes'))
+
+def comparar(base, nuevo, umbral, minimo=MINIMO_SEGUNDOS):
+    """
+    Contrasta dos corridas e imprime la variación de tiempo y memoria de
+    cada medición común. Retorna la cantidad de regresiones: mediciones
+    cuyo tiempo o memoria crece más de 'umbral' (0.10 = 10 %). Los tiempos
+    por debajo de 'minimo' segundos son ruido: no cuentan como regresión y,
+    si son de la corrida base, no se comparan.
+    """
+    anteriores = {clave(r): r for r in base['resultados'] if 'segundos' in r}
+    regresiones = 0
+    print(f"{'grupo':<7} {'spec':<24} {'medición':<22} {'tiempo':>9} {'memoria':>9}")
+    for resultado in nuevo['resultados']:
+        anterior = anteriores.get(clave(resultado))
+        if anterior is None or 'segundos' not in resultado:
+            continue
+        # Una base por debajo de 'minimo' (o en 0, con relojes gruesos) no sirve de referencia
+        tiempo = None
+        if anterior['segundos'] >= minimo and anterior['segundos'] > 0:
+            tiempo = resultado['segundos'] / anterior['segundos'] - 1
+        memoria = None
+        if resultado.get('memoria_kb') and anterior.get('memoria_kb'):
+            memoria = resultado['memoria_kb'] / anterior['memoria_kb'] - 1
+        regresion = ((tiempo is not None and tiempo > umbral and resultado['segundos'] >= minimo)
+                     or (memoria is not None and memoria > umbral))
+        regresiones += regresion
+        grupo, spec, medicion, tamano = clave(resultado)
+        if tamano is not None:
+            medicion = f"{medicion} {tamano / 1e6:.1f}MB"
+        texto_tiempo = '-' if tiempo is None else f"{tiempo:+.1%}"
+        texto_memoria = '-' if memoria is None else f"{memoria:+.1%}"
+        print(f"{grupo:<7} {spec:<24} {medicion:<22} {texto_tiempo:>9} {texto_memoria:>9}"
+              f"{'  ⚠️ regresión' if regresion else ''}")
+    print(f"\n{regresiones} regresiones por encima de {umbral:.0%}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de punta a punta del compilador y el lexer.")
+    parser.add_argument('--salida', help="archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument('--palabras', type=int, nargs='*', default=[500, 2000],
+                        help="tamaños de las especificaciones sintéticas, en palabras clave")
+    parser.add_argument('--tamanos', type=int, nargs='*', default=TAMANOS,
+                        help="tamaños de entrada del lexer, en KB")
+    parser.add_argument('--lexer-spec', default='slr-2.yal', help="especificación para medir el lexer")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-memoria', action='store_true', help="no medir el pico de memoria")
+    parser.add_argument('--minimo', type=float, default=MINIMO_SEGUNDOS,
+                        help="tiempo por debajo del cual no se reportan regresiones de tiempo")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'), help="comparar dos corridas")
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help="variación a partir de la cual se reporta una regresión (por defecto 0.10)")
+    args = parser.parse_args()
+
+    if args.comparar:
+        corridas = []
+        for ruta in args.comparar:
+            with open(ruta, encoding='utf-8') as f:
+                corridas.append(json.load(f))
+        sys.exit(1 if comparar(*corridas, args.umbral, args.minimo) else 0)
+
+    memoria = not args.sin_memoria
+    resultados = []
+    print("⏱️ Etapas del compilador", file=sys.stderr)
+    for ruta in SPECS:
+        resultados += medir_etapas(ruta, leer_archivo(ruta), args.repeticiones, memoria)
+    for palabras in args.palabras:
+        resultados += medir_etapas(f"sintética {palabras}", generar_yal_palabras(palabras), 1, memoria)
+    print("⏱️ Lexer", file=sys.stderr)
+    resultados += medir_lexer(args.lexer_spec, args.tamanos, args.repeticiones, memoria)
+
+    corrida = {
+        'formato': FORMATO_RESULTADOS,
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(corrida, f, indent=2, ensure_ascii=False)
+        print(f"📄 Resultados guardados en: {args.salida}", file=sys.stderr)
+    else:
+        json.dump(corrida, sys.stdout, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
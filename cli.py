@@ -0,0 +1,237 @@
+"""
+Línea de comandos no interactiva: compila especificaciones .yal y tokeniza
+conjuntos de archivos en un solo proceso, sin diagramas ni preguntas.
+
+Ejemplos:
+    python cli.py compilar slr-1.yal slr-2.yal
+    python cli.py tokenizar slr-2.yal entradas/*.txt --formato jsonl --tiempos
+    python cli.py tokenizar output_afds/slr-2/afd_min.afdb --formato spans < entrada.txt
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from Lector import leer_archivo, ALFABETOS
+from afd_cache import obtener_afd, variante_de
+from afd_serializer import guardar_afd_pickle, guardar_afd_binario, cargar_afd_binario, MAGIA
+from afd_lazy import construir_perezoso
+from lexer import ERROR, Diagnostico, ScannerBytes, crear_scanner, scanner_de_bytes, EntradaMapeada, texto_de
+from main import compilar_afd, renderizar_diagramas
+
+FORMATOS = ('tokens', 'tsv', 'jsonl', 'spans')
+
+class ReporteErrores(Diagnostico):
+    """Reporta cada error léxico por stderr; solo se usa con --errores."""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def error(self, simbolo, posicion):
+        print(f"❌ {self.archivo}:{posicion}: símbolo inesperado {texto_de(simbolo)!r}", file=sys.stderr)
+
+def nombre_spec(ruta):
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+def compilar_spec(ruta, alfabeto='imprimible', utf8=False, forzar=False):
+    """
+    Compila 'ruta' (.yal) pasando por la caché de afd_cache y retorna
+    (afd_dict_min, mapping, segundos, desde_cache).
+    """
+    contenido = leer_archivo(ruta)
+    construido = []
+
+    def construir(texto):
+        construido.append(True)
+        _, _, afd_dict_min, mapping = compilar_afd(texto, alfabeto, utf8)
+        return afd_dict_min, mapping
+
+    inicio = time.perf_counter()
+    afd_dict_min, mapping = obtener_afd(contenido, construir, forzar=forzar, variante=variante_de(alfabeto, utf8))
+    return afd_dict_min, mapping, time.perf_counter() - inicio, not construido
+
+def cargar_scanner(ruta, alfabeto='imprimible', utf8=False, perezoso=False):
+    """Scanner para 'ruta': un artefacto binario se mapea tal cual; un .yal se compila (o sale de la caché)."""
+    with open(ruta, 'rb') as f:
+        if f.read(len(MAGIA)) == MAGIA:
+            return cargar_afd_binario(ruta)
+    if perezoso:
+        return construir_perezoso(leer_archivo(ruta), alfabeto=alfabeto)[0]
+    afd_dict_min, mapping, _, _ = compilar_spec(ruta, alfabeto, utf8)
+    return crear_scanner(afd_dict_min, mapping)
+
+def comando_compilar(args):
+    for ruta in args.specs:
+        afd_dict_min, mapping, segundos, desde_cache = compilar_spec(ruta, args.alfabeto, args.utf8, args.forzar)
+        directorio = os.path.join(args.salida, nombre_spec(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        guardar_afd_pickle(afd_dict_min, os.path.join(directorio, 'afd_min.pkl'))
+        guardar_afd_binario(afd_dict_min, mapping, os.path.join(directorio, 'afd_min.afdb'))
+        if args.diagramas:
+            # Los diagramas necesitan el árbol y el AFD sin minimizar, que la caché no guarda
+            root, afd_dict, afd_dict_min, _ = compilar_afd(leer_archivo(ruta), args.alfabeto, args.utf8)
+            omitidos = renderizar_diagramas(directorio, root, afd_dict, afd_dict_min)
+            if omitidos:
+                print(f"⏭️ Diagramas omitidos por tamaño: {', '.join(omitidos)}")
+        origen = "caché" if desde_cache else "compilado"
+        print(f"📦 {ruta}: {len(afd_dict_min['transitions'])} estados ({origen}, {segundos:.3f} s) -> {directorio}")
+    return 0
+
+def escribir_tokens(out, formato, archivo, tokens):
+    """
+    Escribe los (token, lexema, inicio) de un archivo en 'formato' y retorna
+    (tokens, errores); los errores léxicos llegan con token ERROR.
+    """
+    cantidad = errores = 0
+    if formato == 'tokens':
+        for token, lexema, _ in tokens:
+            if token is ERROR:
+                errores += 1
+                continue
+            out.write(f"  {token}: '{texto_de(lexema)}'\n")
+            cantidad += 1
+    elif formato == 'tsv':
+        for token, lexema, inicio in tokens:
+            if token is ERROR:
+                errores += 1
+                continue
+            out.write(f"{archivo}\t{token}\t{inicio}\t{inicio + len(lexema)}\t{json.dumps(texto_de(lexema), ensure_ascii=False)}\n")
+            cantidad += 1
+    else:
+        for token, lexema, inicio in tokens:
+            if token is ERROR:
+                errores += 1
+                continue
+            out.write(json.dumps({'archivo': archivo, 'token': token, 'lexema': texto_de(lexema),
+                                  'inicio': inicio, 'fin': inicio + len(lexema)}, ensure_ascii=False) + '\n')
+            cantidad += 1
+    return cantidad, errores
+
+def escribir_spans(out, archivo, spans):
+    cantidad = errores = 0
+    for token, inicio, fin in spans:
+        if token is ERROR:
+            errores += 1
+            continue
+        out.write(f"{archivo}\t{token}\t{inicio}\t{fin}\n")
+        cantidad += 1
+    return cantidad, errores
+
+def tokenizar_archivo(scanner, ruta, formato, out, diagnostico=None):
+    """
+    Tokeniza 'ruta' ('-' es stdin) y escribe el resultado; retorna
+    (tokens, errores, tamaño de la entrada). Los errores se cuentan en el
+    mismo recorrido; 'diagnostico' solo hace falta para reportarlos.
+    """
+    en_bytes = isinstance(scanner, ScannerBytes)
+    if formato == 'spans' and ruta != '-':
+        try:
+            scanner_mmap = scanner_de_bytes(scanner)
+        except ValueError:
+            scanner_mmap = None
+        if scanner_mmap is not None:
+            # Archivo mapeado: posiciones en bytes, sin leerlo ni crear lexemas
+            with EntradaMapeada(ruta) as entrada:
+                spans = scanner_mmap.spans(entrada.datos, diagnostico, con_errores=True)
+                return (*escribir_spans(out, ruta, spans), len(entrada))
+
+    if ruta == '-':
+        stream = sys.stdin.buffer if en_bytes else sys.stdin
+        return _tokenizar_stream(scanner, stream, ruta, formato, out, diagnostico)
+    modo = {'mode': 'rb'} if en_bytes else {'mode': 'r', 'encoding': 'utf-8'}
+    with open(ruta, **modo) as f:
+        return _tokenizar_stream(scanner, f, ruta, formato, out, diagnostico)
+
+def _tokenizar_stream(scanner, stream, archivo, formato, out, diagnostico):
+    leido = 0
+
+    def bloques():
+        nonlocal leido
+        for bloque in iter(lambda: stream.read(65536), scanner.vacio):
+            leido += len(bloque)
+            yield bloque
+
+    tokens = scanner.tokenizar_stream(bloques(), diagnostico=diagnostico, con_errores=True)
+    if formato == 'spans':
+        cantidad, errores = escribir_spans(out, archivo, ((t, i, i + len(l)) for t, l, i in tokens))
+    else:
+        cantidad, errores = escribir_tokens(out, formato, archivo, tokens)
+    return cantidad, errores, leido
+
+def comando_tokenizar(args):
+    inicio = time.perf_counter()
+    scanner = cargar_scanner(args.spec, args.alfabeto, args.utf8, args.perezoso)
+    if args.tiempos:
+        print(f"⏱️ {args.spec}: scanner listo en {time.perf_counter() - inicio:.3f} s", file=sys.stderr)
+
+    out = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    codigo = 0
+    total_tokens = total_bytes = total_errores = 0
+    total_inicio = time.perf_counter()
+    try:
+        for ruta in args.archivos or ['-']:
+            if ruta != '-' and not os.path.isfile(ruta):
+                print(f"⚠️ Archivo no encontrado: {ruta}", file=sys.stderr)
+                codigo = 2
+                continue
+            # El diagnóstico recorre cada token: solo se usa para reportar los errores
+            diagnostico = ReporteErrores(ruta) if args.errores else None
+            if args.formato == 'tokens':
+                out.write(f"\n🎯 Tokens de {ruta}:\n")
+            inicio = time.perf_counter()
+            cantidad, errores, tamano = tokenizar_archivo(scanner, ruta, args.formato, out, diagnostico)
+            segundos = time.perf_counter() - inicio
+            total_tokens += cantidad
+            total_bytes += tamano
+            total_errores += errores
+            if args.tiempos:
+                print(f"⏱️ {ruta}: {cantidad} tokens, {errores} errores, "
+                      f"{tamano} unidades en {segundos:.4f} s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.tiempos:
+        segundos = time.perf_counter() - total_inicio
+        print(f"⏱️ Total: {total_tokens} tokens, {total_errores} errores, {total_bytes} unidades en "
+              f"{segundos:.3f} s", file=sys.stderr)
+    if total_errores and args.estricto and codigo == 0:
+        codigo = 1
+    return codigo
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Compila especificaciones YAL y tokeniza archivos sin interacción.")
+    opciones = argparse.ArgumentParser(add_help=False)
+    opciones.add_argument('--alfabeto', choices=sorted(ALFABETOS), default='imprimible',
+                          help="alfabeto de las negaciones [^...] (por defecto imprimible)")
+    opciones.add_argument('--utf8', action='store_true',
+                          help="compilar el AFD sobre los bytes UTF-8 de la entrada")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    compilar = comandos.add_parser('compilar', parents=[opciones], help="compilar .yal y guardar sus artefactos")
+    compilar.add_argument('specs', nargs='+', metavar='SPEC', help="especificaciones .yal")
+    compilar.add_argument('--salida', default='output_afds', help="directorio de artefactos (por defecto output_afds)")
+    compilar.add_argument('--forzar', action='store_true', help="ignorar la caché y reconstruir")
+    compilar.add_argument('--diagramas', action='store_true', help="dibujar también los diagramas")
+    compilar.set_defaults(funcion=comando_compilar)
+
+    tokenizar = comandos.add_parser('tokenizar', parents=[opciones], help="tokenizar archivos o stdin")
+    tokenizar.add_argument('spec', help="especificación .yal o artefacto .afdb")
+    tokenizar.add_argument('archivos', nargs='*', metavar='ARCHIVO', help="archivos de entrada ('-' o ninguno: stdin)")
+    tokenizar.add_argument('--formato', choices=FORMATOS, default='tokens',
+                           help="tokens (legible), tsv, jsonl o spans (sin lexemas)")
+    tokenizar.add_argument('--salida', help="archivo de salida (por defecto stdout)")
+    tokenizar.add_argument('--tiempos', action='store_true', help="reportar tiempos por archivo en stderr")
+    tokenizar.add_argument('--errores', action='store_true', help="reportar cada error léxico en stderr")
+    tokenizar.add_argument('--estricto', action='store_true', help="terminar con código 1 si hubo errores léxicos")
+    tokenizar.add_argument('--perezoso', action='store_true', help="usar el AFD perezoso (solo con .yal)")
+    tokenizar.set_defaults(funcion=comando_tokenizar)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    return args.funcion(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,11 @@
 import pickle
 import os
+import mmap
+from array import array
+
+# Marca de los errores léxicos en spans y tokenizar_stream con con_errores:
+# distinta de cualquier token, incluido None (reglas sin acción)
+ERROR = object()
 
 def cargar_afd(ruta):
     if not os.path.exists(ruta):
@@ -10,49 +16,667 @@ def cargar_afd(ruta):
 def ascii_de(char):
     return str(ord(char))
 
-def lexer(cadena, afd_dict, mapping, output_file='salida_logs.txt', debug=True):
-    pos = 0
-    tokens = []
-    with open(output_file, 'w', encoding='utf-8') as out:
-        while pos < len(cadena):
-            estado_actual = afd_dict['initial']
-            transiciones = afd_dict['transitions']
-            aceptacion = set(afd_dict['accepted'])
+def tabla_de_clases(symbol_classes):
+    """
+    Construye la tabla código -> clase de un AFD a partir de su
+    'symbol_classes': la lista de rangos (desde, hasta, clase), o el
+    diccionario {código: clase} de los AFD anteriores a los rangos.
+
+    Retorna:
+        tuple: (clases, alfabeto) con 'clases' un array indexado por código
+        (-1 fuera del alfabeto) y 'alfabeto' la cantidad de clases.
+    """
+    if isinstance(symbol_classes, dict):
+        symbol_classes = [(codigo, codigo, clase) for codigo, clase in symbol_classes.items()]
+    fin = max((hasta for _, hasta, _ in symbol_classes), default=-1) + 1
+    clases = array('i', [-1]) * fin
+    alfabeto = 0
+    for desde, hasta, clase in symbol_classes:
+        clases[desde:hasta + 1] = array('i', [clase]) * (hasta - desde + 1)
+        alfabeto = max(alfabeto, clase + 1)
+    return clases, alfabeto
+
+class Diagnostico:
+    """
+    Receptor de diagnósticos del lexer. La clase base no hace nada: las
+    subclases redefinen solo los eventos que les interesan.
+
+    Con trazar = True el lexer usa un bucle de escaneo aparte que además
+    reporta, antes de cada token o error, el recorrido de estados completo
+    como una lista de (estado, código, siguiente).
+    """
+    trazar = False
+
+    def token(self, token, lexema, posicion):
+        pass
+
+    def error(self, simbolo, posicion):
+        pass
+
+    def recorrido(self, posicion, pasos):
+        pass
+
+    def cerrar(self):
+        pass
+
+class DiagnosticoArchivo(Diagnostico):
+    """Escribe los tokens y errores léxicos en un archivo de log."""
+
+    def __init__(self, ruta='salida_logs.txt', tokens=True):
+        self.out = open(ruta, 'w', encoding='utf-8')
+        self.tokens = tokens
+
+    def token(self, token, lexema, posicion):
+        if self.tokens:
+            self.out.write(f"✔️ Token: {token}, lexema: '{texto_de(lexema)}'\n")
+
+    def error(self, simbolo, posicion):
+        self.out.write(f"❌ Error léxico: símbolo inesperado '{texto_de(simbolo)}' en posición {posicion}\n")
+
+    def cerrar(self):
+        self.out.close()
+
+class DiagnosticoTraza(Diagnostico):
+    """
+    Guarda en memoria el recorrido de estados de cada token para depuración.
+    'registros' queda como una lista de (posicion, token, lexema, pasos);
+    los errores se registran con token None y el símbolo como lexema.
+    """
+    trazar = True
+
+    def __init__(self):
+        self.registros = []
+        self._pasos = None
+
+    def recorrido(self, posicion, pasos):
+        self._pasos = pasos
+
+    def token(self, token, lexema, posicion):
+        self.registros.append((posicion, token, lexema, self._pasos))
+
+    def error(self, simbolo, posicion):
+        self.registros.append((posicion, None, simbolo, self._pasos))
+
+class ScannerCompilado:
+    """
+    Scanner construido una sola vez a partir de un AFD minimizado
+    (el diccionario de minimize_afd o cargar_afd_pickle).
+
+    Los estados se numeran con enteros y las transiciones se guardan en una
+    tabla plana indexada por estado * alfabeto + clase, donde la clase de
+    cada carácter sale de la tabla 'clases' indexada por su código. Cada
+    carácter cuesta un ord() y dos accesos a tablas.
+
+    'symbol_classes' es una lista de rangos (desde, hasta, clase). Los AFD
+    sin 'symbol_classes' (pickles anteriores, con transiciones por código
+    ASCII) usan una clase por código.
+
+    Atributos:
+        estados (list): Nombre original de cada estado, indexado por su id.
+        inicial (int): Id del estado inicial.
+        clases (array): Clase de símbolos de cada código, -1 si no pertenece al alfabeto.
+        alfabeto (int): Cantidad de clases, es decir, de columnas de la tabla.
+        tabla (array): Estado destino por (estado, clase), -1 si no hay transición.
+        aceptacion (array): Índice en 'tokens' por estado, -1 si no es de aceptación.
+        tokens (list): Token reportado por cada índice de 'aceptacion'.
+    """
+
+    # Entrada vacía del tipo que recorre el scanner
+    vacio = ''
+
+    # Código de un elemento de la entrada (ver tokenizar_lote)
+    _codigo_de = ord
+
+    # Ruta del artefacto binario del que se mapearon las tablas, si lo hay
+    # (ver afd_serializer.cargar_afd_binario)
+    artefacto = None
+
+    def __init__(self, afd_dict, mapping):
+        transiciones = afd_dict['transitions']
+        aceptados = set(afd_dict['accepted'])
+        state_tags = afd_dict.get('state_tags', {})
+
+        # Los estados sin transiciones salientes solo aparecen como destino
+        ids = {afd_dict['initial']: 0}
+        for estado, destinos in transiciones.items():
+            ids.setdefault(estado, len(ids))
+            for destino in destinos.values():
+                ids.setdefault(destino, len(ids))
+        self.estados = list(ids)
 
-            ultimo_estado_final = None
+        class_of = afd_dict.get('symbol_classes')
+        if class_of is None:
+            class_of = {int(sym): int(sym) for destinos in transiciones.values() for sym in destinos}
+        self.clases, self.alfabeto = tabla_de_clases(class_of)
+        self.inicial = ids[afd_dict['initial']]
+
+        self.tabla = array('i', [-1]) * (len(self.estados) * self.alfabeto)
+        for estado, destinos in transiciones.items():
+            base = ids[estado] * self.alfabeto
+            for sym, destino in destinos.items():
+                self.tabla[base + int(sym)] = ids[destino]
+
+        self.tokens = []
+        indices = {}
+        self.aceptacion = array('i', [-1]) * len(self.estados)
+        for nombre, i in ids.items():
+            if nombre not in aceptados:
+                continue
+            if nombre in state_tags:
+                token = mapping.get(state_tags[nombre], 'UNKNOWN')
+            else:
+                token = 'UNKNOWN'
+            clave = (type(token), token)
+            if clave not in indices:
+                indices[clave] = len(self.tokens)
+                self.tokens.append(token)
+            self.aceptacion[i] = indices[clave]
+
+    def __reduce_ex__(self, protocolo):
+        # Un scanner mapeado viaja como su ruta: cada proceso mapea el mismo archivo
+        if self.artefacto is None:
+            return super().__reduce_ex__(protocolo)
+        from afd_serializer import cargar_afd_binario
+        return cargar_afd_binario, (self.artefacto, type(self))
+
+    def _escanear(self, cadena, pos=0, final=True, pendiente=None):
+        """
+        Recorre 'cadena' desde 'pos' aplicando maximal munch y genera tuplas
+        (indice_token, inicio, fin). Un símbolo inesperado se reporta con
+        indice_token = -1 y abarca un solo carácter.
+
+        Si 'final' es False, 'cadena' es solo un bloque de la entrada: cuando
+        un token llega al final del bloque sin que el AFD se detenga, el
+        recorrido termina sin emitirlo. Si se pasa la lista 'pendiente', se
+        llena con [estado, ultimo_token, ultimo_token_pos] de ese token para
+        continuarlo con el bloque siguiente (ver _continuar).
+        """
+        tabla = self.tabla
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        alfabeto = self.alfabeto
+        inicial = self.inicial
+        fin_cadena = len(cadena)
+
+        while pos < fin_cadena:
+            estado = inicial
+            ultimo_token = -1
             ultimo_token_pos = pos
-            recorrido = []
+            i = pos
+            while i < fin_cadena:
+                codigo = ord(cadena[i])
+                if codigo >= n_codigos:
+                    break
+                clase = clases[codigo]
+                if clase < 0:
+                    break
+                estado = tabla[estado * alfabeto + clase]
+                if estado < 0:
+                    break
+                i += 1
+                if aceptacion[estado] >= 0:
+                    ultimo_token = aceptacion[estado]
+                    ultimo_token_pos = i
+            else:
+                if not final:
+                    if pendiente is not None:
+                        pendiente[:] = estado, ultimo_token, ultimo_token_pos
+                    return
 
+            if ultimo_token < 0:
+                yield -1, pos, pos + 1
+                pos += 1
+                continue
+
+            yield ultimo_token, pos, ultimo_token_pos
+            pos = ultimo_token_pos
+
+    @staticmethod
+    def _codigo(cadena, i):
+        """Código del carácter 'i' de 'cadena'; solo lo usa la traza."""
+        return ord(cadena[i])
+
+    def _escanear_traza(self, cadena, pos=0, final=True, pendiente=None):
+        """
+        Igual que _escanear, pero cada tupla lleva además el recorrido
+        (estado, código, siguiente) del token, con los nombres originales
+        de los estados. Solo se usa cuando se pide una traza; el estado
+        pendiente incluye también los pasos del token.
+        """
+        estados = self.estados
+        fin_cadena = len(cadena)
+
+        while pos < fin_cadena:
+            estado = self.inicial
+            ultimo_token = -1
+            ultimo_token_pos = pos
+            pasos = []
             i = pos
-            while i < len(cadena):
-                char = cadena[i]
-                ascii_token_char = str(ord(char))
-                if estado_actual in transiciones and ascii_token_char in transiciones[estado_actual]:
-                    siguiente = transiciones[estado_actual][ascii_token_char]
-                    recorrido.append((estado_actual, ascii_token_char, siguiente))
-                    estado_actual = siguiente
+            while i < fin_cadena:
+                codigo = self._codigo(cadena, i)
+                clase = self.clases[codigo] if codigo < len(self.clases) else -1
+                if clase < 0:
+                    break
+                siguiente = self.tabla[estado * self.alfabeto + clase]
+                if siguiente < 0:
+                    break
+                pasos.append((estados[estado], str(codigo), estados[siguiente]))
+                estado = siguiente
+                i += 1
+                if self.aceptacion[estado] >= 0:
+                    ultimo_token = self.aceptacion[estado]
+                    ultimo_token_pos = i
+            else:
+                if not final:
+                    if pendiente is not None:
+                        pendiente[:] = estado, ultimo_token, ultimo_token_pos, pasos
+                    return
+
+            if ultimo_token < 0:
+                yield -1, pos, pos + 1, pasos
+                pos += 1
+                continue
+
+            yield ultimo_token, pos, ultimo_token_pos, pasos
+            pos = ultimo_token_pos
+
+    def _continuar(self, cadena, pendiente, desplazamiento):
+        """
+        Continúa sobre 'cadena' el token que quedó pendiente al agotarse el
+        bloque anterior, desde el estado guardado en 'pendiente' por
+        _escanear, sin volver a recorrer lo ya leído. 'desplazamiento' es la
+        posición de 'cadena' contando desde el inicio del token.
+
+        Actualiza 'pendiente' y retorna True si el AFD se detuvo dentro de
+        'cadena', o False si la agotó y el token sigue pendiente.
+        """
+        tabla = self.tabla
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        alfabeto = self.alfabeto
+        codigo_de = self._codigo
+        estado, ultimo_token, ultimo_token_pos = pendiente[:3]
+        pasos = pendiente[3] if len(pendiente) > 3 else None
+
+        detenido = True
+        for i in range(len(cadena)):
+            codigo = codigo_de(cadena, i)
+            clase = clases[codigo] if codigo < n_codigos else -1
+            if clase < 0:
+                break
+            siguiente = tabla[estado * alfabeto + clase]
+            if siguiente < 0:
+                break
+            if pasos is not None:
+                pasos.append((self.estados[estado], str(codigo), self.estados[siguiente]))
+            estado = siguiente
+            if aceptacion[estado] >= 0:
+                ultimo_token = aceptacion[estado]
+                ultimo_token_pos = desplazamiento + i + 1
+        else:
+            detenido = False
+
+        pendiente[:3] = estado, ultimo_token, ultimo_token_pos
+        return detenido
+
+    def _recorrer(self, cadena, pos, final, diagnostico, desplazamiento=0, pendiente=None):
+        """
+        Genera (indice_token, inicio, fin) como _escanear y reporta cada token
+        y error a 'diagnostico', con las posiciones corridas en 'desplazamiento'.
+        """
+        tokens = self.tokens
+        if diagnostico.trazar:
+            for indice, inicio, fin, pasos in self._escanear_traza(cadena, pos, final, pendiente):
+                diagnostico.recorrido(desplazamiento + inicio, pasos)
+                if indice < 0:
+                    diagnostico.error(cadena[inicio:fin], desplazamiento + inicio)
+                else:
+                    diagnostico.token(tokens[indice], cadena[inicio:fin], desplazamiento + inicio)
+                yield indice, inicio, fin
+        else:
+            for indice, inicio, fin in self._escanear(cadena, pos, final, pendiente):
+                if indice < 0:
+                    diagnostico.error(cadena[inicio:fin], desplazamiento + inicio)
+                else:
+                    diagnostico.token(tokens[indice], cadena[inicio:fin], desplazamiento + inicio)
+                yield indice, inicio, fin
+
+    def tokenizar(self, cadena):
+        """Retorna la lista de (token, lexema) de 'cadena', omitiendo los errores léxicos."""
+        tokens = self.tokens
+        return [(tokens[indice], cadena[inicio:fin])
+                for indice, inicio, fin in self._escanear(cadena) if indice >= 0]
+
+    def tokenizar_lote(self, entradas):
+        """
+        Tokeniza cada cadena de 'entradas' y retorna una lista de (token, lexema)
+        por entrada, omitiendo los errores léxicos.
+
+        Es el mismo recorrido que _escanear, pero en un solo bucle para todo
+        el lote: las tablas se leen una vez y no se crea un generador por
+        entrada, que en entradas cortas cuesta más que escanearlas.
+        """
+        tabla = self.tabla
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        alfabeto = self.alfabeto
+        inicial = self.inicial
+        tokens = self.tokens
+        codigo_de = self._codigo_de
+
+        resultados = []
+        for cadena in entradas:
+            encontrados = []
+            agregar = encontrados.append
+            fin_cadena = len(cadena)
+            pos = 0
+            while pos < fin_cadena:
+                estado = inicial
+                ultimo_token = -1
+                ultimo_token_pos = pos
+                i = pos
+                while i < fin_cadena:
+                    codigo = codigo_de(cadena[i])
+                    if codigo >= n_codigos:
+                        break
+                    clase = clases[codigo]
+                    if clase < 0:
+                        break
+                    estado = tabla[estado * alfabeto + clase]
+                    if estado < 0:
+                        break
                     i += 1
-                    if estado_actual in aceptacion:
-                        ultimo_estado_final = estado_actual
+                    if aceptacion[estado] >= 0:
+                        ultimo_token = aceptacion[estado]
                         ultimo_token_pos = i
-                else:
-                    break
+                if ultimo_token < 0:
+                    pos += 1
+                    continue
+                agregar((tokens[ultimo_token], cadena[pos:ultimo_token_pos]))
+                pos = ultimo_token_pos
+            resultados.append(encontrados)
+        return resultados
 
-            if ultimo_estado_final is None:
-                out.write(f"❌ Error léxico: símbolo inesperado '{cadena[pos]}' en posición {pos}\n")
-                pos = pos + 1
+    def spans(self, cadena, diagnostico=None, con_errores=False):
+        """
+        Genera (token, inicio, fin) por cada token de 'cadena', sin construir
+        los lexemas: sobre un archivo mapeado (ver EntradaMapeada) el escaneo
+        no copia la entrada ni asigna un objeto por lexema.
+
+        Con 'con_errores' también genera cada error léxico, con token ERROR,
+        para contarlos sin pasar por un diagnóstico.
+        """
+        tokens = self.tokens
+        if diagnostico is None:
+            recorrido = self._escanear(cadena)
+        else:
+            recorrido = self._recorrer(cadena, 0, True, diagnostico)
+        for indice, inicio, fin in recorrido:
+            if indice >= 0:
+                yield tokens[indice], inicio, fin
+            elif con_errores:
+                yield ERROR, inicio, fin
+
+    def tokenizar_stream(self, stream, tamano_bloque=65536, diagnostico=None, con_errores=False):
+        """
+        Tokeniza un flujo de texto por bloques de 'tamano_bloque' caracteres y
+        genera perezosamente tuplas (token, lexema, offset), donde 'offset' es
+        la posición del lexema en la entrada completa.
+
+        'stream' puede ser un archivo abierto en modo texto (o cualquier objeto
+        con read) o un iterable de cadenas. Solo se retiene en memoria el
+        bloque actual más los bloques del token pendiente que cruza el borde.
+        El AFD de ese token continúa con cada bloque nuevo desde el estado en
+        que quedó (ver _continuar), así que cada carácter se recorre una sola
+        vez aunque el token abarque muchos bloques.
+
+        Si se pasa un 'diagnostico', recibe los tokens y errores con su
+        offset en la entrada completa. Con 'con_errores' los errores léxicos
+        también se generan, con token ERROR.
+        """
+        if hasattr(stream, 'read'):
+            bloques = iter(lambda: stream.read(tamano_bloque), self.vacio)
+        else:
+            bloques = iter(stream)
+
+        tokens = self.tokens
+        trazar = diagnostico is not None and diagnostico.trazar
+        # Bloques desde el inicio del token pendiente, su largo total y el
+        # estado del AFD en ese token (vacío si no hay token pendiente)
+        pendientes = []
+        largo = 0
+        pendiente = []
+        desplazamiento = 0
+        final = False
+        while not final:
+            bloque = next(bloques, None)
+            if bloque is None:
+                final = True
+            elif not bloque:
                 continue
-            
-            lexema = cadena[pos:ultimo_token_pos]
-            if ultimo_estado_final in afd_dict.get('state_tags', {}):
-                tag = afd_dict['state_tags'][ultimo_estado_final]
-                token = mapping.get(tag, 'UNKNOWN')
+
+            pos = 0
+            if pendiente:
+                if not final:
+                    pendientes.append(bloque)
+                    detenido = self._continuar(bloque, pendiente, largo)
+                    largo += len(bloque)
+                    if not detenido:
+                        continue
+                # El token pendiente terminó: se emite y el escaneo sigue desde su fin
+                buffer = self.vacio.join(pendientes)
+                pendientes = []
+                _, indice, pos = pendiente[:3]
+                if indice < 0:
+                    pos = 1
+                if diagnostico is not None:
+                    if trazar:
+                        diagnostico.recorrido(desplazamiento, pendiente[3])
+                    if indice < 0:
+                        diagnostico.error(buffer[:pos], desplazamiento)
+                    else:
+                        diagnostico.token(tokens[indice], buffer[:pos], desplazamiento)
+                if indice >= 0:
+                    yield tokens[indice], buffer[:pos], desplazamiento
+                elif con_errores:
+                    yield ERROR, buffer[:pos], desplazamiento
+                del pendiente[:]
+            elif final:
+                break
             else:
-                token = 'UNKNOWN'
+                buffer = bloque
+
+            if diagnostico is None:
+                recorrido = self._escanear(buffer, pos, final, pendiente)
+            else:
+                recorrido = self._recorrer(buffer, pos, final, diagnostico, desplazamiento, pendiente)
+
+            consumido = pos
+            for indice, inicio, fin in recorrido:
+                consumido = fin
+                if indice >= 0:
+                    yield tokens[indice], buffer[inicio:fin], desplazamiento + inicio
+                elif con_errores:
+                    yield ERROR, buffer[inicio:fin], desplazamiento + inicio
+
+            if pendiente:
+                pendientes = [buffer[consumido:]]
+                largo = len(buffer) - consumido
+                pendiente[2] -= consumido
+            desplazamiento += consumido
+
+class ScannerBytes(ScannerCompilado):
+    """
+    Scanner para AFD compilados sobre bytes UTF-8 (afd_dict['encoding'] ==
+    'utf-8'): recorre directamente objetos bytes, bytearray o mmap, sin
+    decodificarlos. Las secuencias multibyte están dentro del autómata, así
+    que los lexemas son slices de bytes y las posiciones son offsets en bytes.
+    Un byte que no continúa ningún token se reporta como error por sí solo.
+    """
+    vacio = b''
+    _codigo_de = int
+
+    def _escanear(self, cadena, pos=0, final=True, pendiente=None):
+        """Igual que ScannerCompilado._escanear, pero cada elemento de 'cadena' ya es un byte."""
+        tabla = self.tabla
+        aceptacion = self.aceptacion
+        clases = self.clases
+        n_codigos = len(clases)
+        alfabeto = self.alfabeto
+        inicial = self.inicial
+        fin_cadena = len(cadena)
 
-            tokens.append((token, lexema))
-            if debug:
-                out.write(f"✔️ Token: {token}, lexema: '{lexema}'\n")
+        while pos < fin_cadena:
+            estado = inicial
+            ultimo_token = -1
+            ultimo_token_pos = pos
+            i = pos
+            while i < fin_cadena:
+                codigo = cadena[i]
+                if codigo >= n_codigos:
+                    break
+                clase = clases[codigo]
+                if clase < 0:
+                    break
+                estado = tabla[estado * alfabeto + clase]
+                if estado < 0:
+                    break
+                i += 1
+                if aceptacion[estado] >= 0:
+                    ultimo_token = aceptacion[estado]
+                    ultimo_token_pos = i
+            else:
+                if not final:
+                    if pendiente is not None:
+                        pendiente[:] = estado, ultimo_token, ultimo_token_pos
+                    return
+
+            if ultimo_token < 0:
+                yield -1, pos, pos + 1
+                pos += 1
+                continue
+
+            yield ultimo_token, pos, ultimo_token_pos
             pos = ultimo_token_pos
 
-    return tokens
\ No newline at end of file
+    @staticmethod
+    def _codigo(cadena, i):
+        return cadena[i]
+
+def scanner_de_bytes(scanner):
+    """
+    Retorna un scanner que recorre bytes con las mismas tablas que 'scanner'.
+
+    Un AFD sobre bytes UTF-8 ya es un ScannerBytes. Un AFD de texto sirve si
+    su alfabeto es ASCII, porque entonces cada carácter válido es un byte;
+    un carácter multibyte de la entrada se reporta como un error por byte.
+    """
+    if isinstance(scanner, ScannerBytes):
+        return scanner
+    if type(scanner) is not ScannerCompilado or len(scanner.clases) > 128:
+        raise ValueError("El escaneo de bytes requiere un AFD compilado con utf8 o de alfabeto ASCII")
+    copia = ScannerBytes.__new__(ScannerBytes)
+    copia.__dict__.update(scanner.__dict__)
+    return copia
+
+class EntradaMapeada:
+    """
+    Archivo de entrada mapeado en memoria (mmap) de solo lectura, para
+    escanearlo como buffer de bytes sin leerlo ni decodificarlo.
+
+    'datos' se pasa a ScannerBytes.spans y 'lexema(inicio, fin)' retorna
+    una memoryview sobre el mapeo, sin copiar. Las vistas de lexema son
+    válidas mientras la entrada esté abierta; para conservarlas después
+    hay que copiarlas con bytes(). Se usa como context manager.
+    """
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, 'rb')
+        # mmap no admite archivos vacíos
+        if os.fstat(self._archivo.fileno()).st_size:
+            self.datos = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.datos = b''
+        self.vista = memoryview(self.datos)
+
+    def __len__(self):
+        return len(self.datos)
+
+    def lexema(self, inicio, fin):
+        return self.vista[inicio:fin]
+
+    def cerrar(self):
+        self.vista.release()
+        if isinstance(self.datos, mmap.mmap):
+            try:
+                self.datos.close()
+            except BufferError:
+                # Quedan vistas de lexema vivas: el mapeo se libera con la última
+                pass
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def crear_scanner(afd_dict, mapping):
+    """Retorna el scanner adecuado para 'afd_dict': ScannerBytes si el AFD es sobre bytes UTF-8."""
+    if isinstance(afd_dict, ScannerCompilado):
+        return afd_dict
+    if afd_dict.get('encoding') == 'utf-8':
+        return ScannerBytes(afd_dict, mapping)
+    return ScannerCompilado(afd_dict, mapping)
+
+def texto_de(lexema):
+    """Lexema como texto para mostrarlo: los bytes o memoryview de un ScannerBytes se decodifican como UTF-8."""
+    if not isinstance(lexema, str):
+        return str(lexema, 'utf-8', errors='replace')
+    return lexema
+
+def lexer(cadena, afd_dict, mapping, output_file=None, debug=False, diagnostico=None):
+    """
+    Tokeniza 'cadena' y retorna la lista de (token, lexema).
+
+    Sin diagnóstico no se escribe ningún log. 'diagnostico' recibe los
+    eventos del lexer (ver Diagnostico); 'output_file' es un atajo para
+    usar un DiagnosticoArchivo, que además registra cada token si 'debug'.
+    """
+    scanner = crear_scanner(afd_dict, mapping)
+
+    propio = diagnostico is None and output_file is not None
+    if propio:
+        diagnostico = DiagnosticoArchivo(output_file, tokens=debug)
+    if diagnostico is None:
+        return scanner.tokenizar(cadena)
+
+    try:
+        nombres = scanner.tokens
+        return [(nombres[indice], cadena[inicio:fin])
+                for indice, inicio, fin in scanner._recorrer(cadena, 0, True, diagnostico) if indice >= 0]
+    finally:
+        if propio:
+            diagnostico.cerrar()
+
+def lexer_stream(stream, afd_dict, mapping, tamano_bloque=65536, diagnostico=None):
+    """
+    Versión en streaming de lexer: genera (token, lexema, offset) a medida
+    que se lee 'stream', sin materializar la entrada ni la lista de tokens.
+    """
+    scanner = crear_scanner(afd_dict, mapping)
+    return scanner.tokenizar_stream(stream, tamano_bloque, diagnostico)
+
+def lexer_mmap(ruta, afd_dict, mapping, diagnostico=None):
+    """
+    Tokeniza el archivo 'ruta' mapeándolo en memoria y genera spans
+    (token, inicio, fin) con offsets en bytes. La entrada nunca se carga
+    como cadena y no se crea ningún lexema salvo los que pida 'diagnostico'.
+    Para obtener lexemas bajo demanda usar EntradaMapeada directamente.
+    """
+    scanner = scanner_de_bytes(crear_scanner(afd_dict, mapping))
+    with EntradaMapeada(ruta) as entrada:
+        yield from scanner.spans(entrada.datos, diagnostico)
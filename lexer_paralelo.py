@@ -0,0 +1,162 @@
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from lexer import crear_scanner, scanner_de_bytes, EntradaMapeada
+
+# Por debajo de este tamaño no vale la pena levantar procesos
+TAMANO_MINIMO = 1 << 20
+
+# Estado de cada proceso trabajador, inicializado una sola vez por proceso
+_scanner = None
+_entrada = None
+
+def _iniciar_trabajador(scanner, ruta):
+    global _scanner, _entrada
+    _scanner = scanner
+    _entrada = EntradaMapeada(ruta)
+
+def _iniciar_lote(scanner):
+    global _scanner
+    _scanner = scanner
+
+def _tokenizar_lote(entradas):
+    return _scanner.tokenizar_lote(entradas)
+
+def _lexear_trozo(inicio, fin):
+    """
+    Tokeniza especulativamente desde 'inicio' como si ahí empezara un token,
+    hasta el primer token que empieza en 'fin' o después. El último token
+    puede terminar más allá de 'fin': el mapeo tiene el archivo completo.
+
+    Retorna (indices, inicios, fines) como arrays, que viajan al proceso
+    principal mucho más baratos que una lista de tuplas.
+    """
+    indices = array('i')
+    inicios = array('q')
+    fines = array('q')
+    for indice, desde, hasta in _scanner._escanear(_entrada.datos, inicio):
+        if desde >= fin:
+            break
+        indices.append(indice)
+        inicios.append(desde)
+        fines.append(hasta)
+    return indices, inicios, fines
+
+def cortes(datos, cantidad):
+    """
+    Divide 'datos' en 'cantidad' trozos de tamaño parecido y retorna la
+    lista de (inicio, fin). Cada corte se corre hasta después del siguiente
+    salto de línea: en lenguajes separados por espacios ahí casi siempre
+    empieza un token, y el trozo se alinea sin re-escanear nada.
+    """
+    total = len(datos)
+    limites = [0]
+    for k in range(1, cantidad):
+        corte = max(total * k // cantidad, limites[-1])
+        salto = datos.find(b'\n', corte)
+        corte = total if salto < 0 else salto + 1
+        if corte > limites[-1] and corte < total:
+            limites.append(corte)
+    limites.append(total)
+    return list(zip(limites, limites[1:]))
+
+def unir_trozos(scanner, datos, trozos, resultados):
+    """
+    Une los resultados especulativos de cada trozo en el recorrido
+    secuencial y genera lotes (indices, inicios, fines) de tokens
+    consecutivos: un tramo de un trozo o un único token re-escaneado.
+
+    Maximal munch desde una posición dada siempre produce los mismos
+    tokens, así que si el recorrido verdadero llega a una posición donde el
+    trozo también empezó un token, el resto del trozo es correcto tal cual.
+    Mientras no coincidan se re-escanea secuencialmente desde la posición
+    verdadera, token por token, hasta sincronizar o agotar el trozo.
+    """
+    pos = 0
+    for (_, fin), (indices, inicios, fines) in zip(trozos, resultados):
+        while pos < fin:
+            k = bisect_left(inicios, pos)
+            if k < len(inicios) and inicios[k] == pos:
+                yield indices[k:], inicios[k:], fines[k:]
+                pos = fines[-1]
+                break
+            indice, desde, hasta = next(scanner._escanear(datos, pos))
+            yield (indice,), (desde,), (hasta,)
+            pos = hasta
+
+def lexer_paralelo(ruta, afd_dict, mapping, procesos=None, trozos=None):
+    """
+    Tokeniza el archivo 'ruta' repartiendo trozos entre 'procesos' procesos
+    (por defecto, uno por CPU) y genera spans (token, inicio, fin) con
+    offsets en bytes, exactamente los mismos que lexer.lexer_mmap.
+
+    Cada proceso mapea el archivo por su cuenta y recibe el scanner una sola
+    vez; los trozos ('trozos', por defecto cuatro por proceso) se tokenizan
+    de forma especulativa y el proceso principal los une re-sincronizando
+    en los bordes (ver unir_trozos). Los errores léxicos se omiten.
+    """
+    scanner = scanner_de_bytes(crear_scanner(afd_dict, mapping))
+    procesos = procesos or os.cpu_count() or 1
+    nombres = scanner.tokens
+
+    with EntradaMapeada(ruta) as entrada:
+        datos = entrada.datos
+        if procesos == 1 or len(datos) < TAMANO_MINIMO:
+            for indice, inicio, fin in scanner._escanear(datos):
+                if indice >= 0:
+                    yield nombres[indice], inicio, fin
+            return
+
+        partes = cortes(datos, trozos or 4 * procesos)
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador,
+                                 initargs=(scanner, ruta)) as pool:
+            resultados = pool.map(_lexear_trozo, *zip(*partes))
+            for indices, inicios, fines in unir_trozos(scanner, datos, partes, resultados):
+                # Sin errores léxicos el lote se traduce sin un paso de Python por token
+                if -1 not in indices:
+                    yield from zip(map(nombres.__getitem__, indices), inicios, fines)
+                    continue
+                for indice, inicio, fin in zip(indices, inicios, fines):
+                    if indice >= 0:
+                        yield nombres[indice], inicio, fin
+
+def _lotes(entradas, tamano):
+    """Agrupa el iterable 'entradas' en listas de a lo sumo 'tamano' elementos."""
+    entradas = iter(entradas)
+    while True:
+        lote = list(islice(entradas, tamano))
+        if not lote:
+            return
+        yield lote
+
+def lexer_lote(entradas, afd_dict, mapping, procesos=None, hilos=None, tamano_lote=1000):
+    """
+    Tokeniza muchas entradas cortas con un mismo lexer y genera, en orden,
+    la lista de (token, lexema) de cada una. El scanner se construye una
+    sola vez y no se abre ningún log, a diferencia de llamar a lexer.lexer
+    por cada entrada con el diccionario del AFD.
+
+    Con 'procesos' las entradas se reparten en lotes de 'tamano_lote' entre
+    procesos que reciben el scanner una sola vez; con 'hilos', entre hilos
+    que comparten el scanner (ScannerCompilado es de solo lectura al
+    tokenizar; ScannerPerezoso no lo es y no debe usarse con hilos).
+    """
+    scanner = crear_scanner(afd_dict, mapping)
+    lotes = _lotes(entradas, tamano_lote)
+    if procesos:
+        pool = ProcessPoolExecutor(procesos, initializer=_iniciar_lote, initargs=(scanner,))
+        resultados = pool.map(_tokenizar_lote, lotes)
+    elif hilos:
+        pool = ThreadPoolExecutor(hilos)
+        resultados = pool.map(scanner.tokenizar_lote, lotes)
+    else:
+        for lote in lotes:
+            yield from scanner.tokenizar_lote(lote)
+        return
+
+    with pool:
+        for tokens in resultados:
+            yield from tokens
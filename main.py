@@ -1,18 +1,31 @@
 import os
-from Lector import leer_archivo, parse_yal_config, combine_expressions
-from shunting import shunting_yard, limpiar_postfix
-from afd_serializer import guardar_afd_pickle, cargar_afd_pickle
-from afd_inspector import mostrar_info_afd
-from lexer import lexer
+from Lector import leer_archivo, parse_yal_config, construir_ast
+from regex_ast import to_utf8
+from afd_serializer import guardar_afd_pickle, guardar_afd_binario, cargar_afd_binario
+from afd_inspector import mostrar_resumen_afd
+from afd_cache import cargar_cache, guardar_cache, clave_yal, variante_de
+from lexer import (
+    lexer,
+    lexer_stream,
+    scanner_de_bytes,
+    texto_de,
+    ScannerBytes,
+    EntradaMapeada,
+    DiagnosticoArchivo
+)
+from afd_lazy import construir_perezoso
+from concurrent.futures import ThreadPoolExecutor
 import json
+import graphviz
 
 from afd_directo import (
-    build_syntax_tree,
+    build_syntax_tree_ast,
+    iter_nodes,
     generate_ast_graph,
+    afd_graph,
     compute_followpos,
     generate_afd,
-    minimize_afd,
-    st_m
+    minimize_afd
 )
 
 def afd_to_json(afd_dict):
@@ -21,99 +34,222 @@ def afd_to_json(afd_dict):
         "accepted": afd_dict["accepted"],
         "initial": afd_dict["initial"],
         "states": {str(list(k)): v for k, v in afd_dict["states"].items()},
-        "state_tags": afd_dict.get("state_tags", {})
-
+        "state_tags": afd_dict.get("state_tags", {}),
+        "symbol_classes": afd_dict.get("symbol_classes")
     }
-def main():
-    ruta = "slr-4" 
-    contenido = leer_archivo(ruta + ".yal")
-     
-    config = parse_yal_config(contenido)
-    master_expr, mapping = combine_expressions(config)
-    
-    
-    print("Expresión maestra combinada para Shunting:")
-    print(master_expr)
-
-    print("\nMapping de procedencia:")
-    for tag, accion in mapping.items():
-        print(f"{tag}: {accion}")
 
-    postfix_expr = shunting_yard(master_expr)
+def escribir_tokens(tokens, output_file='salida_tokens.txt'):
+    with open(output_file, 'w', encoding='utf-8') as out:
+        # Mostrar tokens finales
+        out.write("\n🎯 Tokens generados:\n")
+        for tipo, lexema in tokens:
+            out.write(f"  {tipo}: '{texto_de(lexema)}'\n")
+
+def escribir_spans(scanner, ruta_archivo, output_file='salida_tokens.txt'):
+    """
+    Tokeniza 'ruta_archivo' mapeado en memoria y escribe un token por línea
+    como 'token inicio fin' (offsets en bytes), sin construir los lexemas.
+    """
+    with EntradaMapeada(ruta_archivo) as entrada, open(output_file, 'w', encoding='utf-8') as out:
+        out.write("\n🎯 Tokens generados (token inicio fin):\n")
+        for tipo, inicio, fin in scanner.spans(entrada.datos):
+            out.write(f"  {tipo} {inicio} {fin}\n")
+
+# Por encima de estos tamaños no se dibuja el diagrama: Graphviz tardaría
+# más que todo el pipeline y el resultado sería ilegible
+LIMITE_NODOS_AST = 2000
+LIMITE_ESTADOS_DIAGRAMA = 500
+
+def compilar_afd(contenido, alfabeto='imprimible', utf8=False):
+    """
+    Ejecuta el pipeline completo sobre el texto de un .yal sin imprimir ni
+    dibujar nada: parseo a árbol de expresiones, árbol sintáctico,
+    followpos, AFD y minimización. Retorna (root, afd_dict, afd_dict_min,
+    mapping); root y afd_dict solo hacen falta para los diagramas.
+
+    'alfabeto' es el de las negaciones [^...] (ver Lector.ALFABETOS). Con
+    'utf8' el AFD se compila sobre los bytes UTF-8 de la entrada y queda
+    marcado con afd_dict_min['encoding'] = 'utf-8'.
+    """
+    ast, mapping = construir_ast(parse_yal_config(contenido), alfabeto)
+    if utf8:
+        ast = to_utf8(ast)
+    root, positions = build_syntax_tree_ast(ast)
+    followpos = compute_followpos(root, positions)
+    afd_dict = generate_afd(root, positions, followpos)
+    afd_dict_min = minimize_afd(afd_dict)
+    if utf8:
+        afd_dict_min['encoding'] = 'utf-8'
+    return root, afd_dict, afd_dict_min, mapping
+
+def renderizar_diagramas(output_dir, root, afd_dict, afd_dict_min,
+                         limite_nodos=LIMITE_NODOS_AST, limite_estados=LIMITE_ESTADOS_DIAGRAMA):
+    """
+    Dibuja en 'output_dir' el árbol sintáctico, el AFD y el AFD minimizado
+    (este también en PDF). Los que superan 'limite_nodos' nodos o
+    'limite_estados' estados se omiten. Retorna la lista de diagramas omitidos.
+    """
+    omitidos = []
+    nodos = sum(1 for _ in iter_nodes(root))
+    if nodos <= limite_nodos:
+        generate_ast_graph(root).render(f"{output_dir}/ast", format="png", cleanup=True)
+    else:
+        omitidos.append(f"ast ({nodos} nodos)")
 
-    
-    # Intentamos construir el árbol. Si falla, aplicamos limpieza.
-    try:
-        root, positions = build_syntax_tree(st_m(postfix_expr))
-    except ValueError as e:
-        print("\n⚠️ Error al construir el árbol, aplicando limpieza de postfix...")
-        postfix_expr = limpiar_postfix(postfix_expr)
-        print("Postfix corregida:")
-        print(postfix_expr)
-        tokens = (st_m(postfix_expr))
-        root, positions = build_syntax_tree(tokens)
+    if len(afd_dict['transitions']) <= limite_estados:
+        afd_graph(afd_dict).render(f"{output_dir}/afd", format="png", cleanup=True)
+    else:
+        omitidos.append(f"afd ({len(afd_dict['transitions'])} estados)")
 
-    print("\nResultado en notación Postfix (con #):")
-    print(postfix_expr)
+    if len(afd_dict_min['transitions']) <= limite_estados:
+        minimized_afd = afd_graph(afd_dict_min, 'MinAFD')
+        minimized_afd.attr(rankdir='LR', size='500,10', dpi='300')
+        minimized_afd.render(f"{output_dir}/afd_minimized", format="png", cleanup=True)
+        minimized_afd.render(f"{output_dir}/afd_minimized", format="pdf", cleanup=True)
+    else:
+        omitidos.append(f"afd_minimized ({len(afd_dict_min['transitions'])} estados)")
+    return omitidos
+
+def renderizar_en_segundo_plano(*args, **kwargs):
+    """
+    Corre renderizar_diagramas en un hilo aparte y retorna su Future. El
+    trabajo pesado lo hacen los procesos 'dot' de Graphviz, así que el hilo
+    no compite con el lexer por el GIL.
+    """
+    pool = ThreadPoolExecutor(1)
+    futuro = pool.submit(renderizar_diagramas, *args, **kwargs)
+    pool.shutdown(wait=False)
+    return futuro
+
+def construir_afd(contenido, output_dir, alfabeto='imprimible', utf8=False, diagramas=True):
+    """
+    Compila el .yal con compilar_afd mostrando el resultado por pantalla.
+    Con 'diagramas' los diagramas se dibujan en segundo plano en 'output_dir'.
+
+    Retorna (afd_dict_min, mapping, futuro), donde 'futuro' es el Future de
+    renderizar_en_segundo_plano, o None sin diagramas.
+    """
+    root, afd_dict, afd_dict_min, mapping = compilar_afd(contenido, alfabeto, utf8)
+
+    print("Mapping de procedencia:")
+    for tag, accion in mapping.items():
+        print(f"{tag}: {accion}")
+    print(json.dumps(afd_to_json(afd_dict_min), indent=4))
+    print("\nEstados de aceptación:", afd_dict['accepted'])
 
-    followpos = compute_followpos(root, positions)
+    futuro = None
+    if diagramas:
+        futuro = renderizar_en_segundo_plano(output_dir, root, afd_dict, afd_dict_min)
+        print(f"\n🖼️ Generando diagramas en segundo plano en: {output_dir}")
+    return afd_dict_min, mapping, futuro
+
+def main(ruta="slr-4", forzar=False, perezoso=False, alfabeto='imprimible', utf8=False, diagramas=True):
+    """
+    Compila 'ruta'.yal (o lo recupera de la caché si el texto no cambió) y
+    tokeniza una entrada elegida por el usuario. Con 'forzar' se ignora la
+    caché y se reconstruye todo el pipeline.
+
+    Con 'perezoso' no se construye el AFD completo: se usa un
+    ScannerPerezoso que materializa los estados a medida que la entrada
+    los visita (útil para especificaciones con muchísimas reglas).
+
+    'alfabeto' y 'utf8' se pasan a construir_afd; en modo 'utf8' los
+    archivos se tokenizan como bytes, sin decodificarlos. Sin 'diagramas'
+    no se dibuja nada; si no, se dibujan mientras se tokeniza.
+    """
+    contenido = leer_archivo(ruta + ".yal")
+
+    if perezoso:
+        if utf8:
+            print("⚠️ El modo perezoso trabaja sobre texto: se ignora utf8.")
+        scanner, mapping = construir_perezoso(contenido, alfabeto=alfabeto)
+        print("💤 AFD perezoso listo: los estados se construyen al tokenizar.")
+        tokenizar_entrada(scanner, mapping)
+        return
 
     output_dir = f"output_afds/{ruta.split('.')[0]}"
     os.makedirs(output_dir, exist_ok=True)
 
-    generate_ast_graph(root).render(f"{output_dir}/ast", format="png", cleanup=True)
-    afd, afd_dict = generate_afd(root, positions, followpos)
-
-    afd.render(f"{output_dir}/afd", format="png", cleanup=True)
-    minimized_afd, afd_dict_min = minimize_afd(afd_dict)
-    minimized_afd.attr(rankdir='LR', size='500,10', dpi='300')
-    minimized_afd.render(f"{output_dir}/afd_minimized", format="png", cleanup=True)
-    minimized_afd.render(f"{output_dir}/afd_minimized", format="pdf", cleanup=True)
-
-    print(json.dumps(afd_to_json(afd_dict_min), indent=4))
+    variante = variante_de(alfabeto, utf8)
+    encontrado = None if forzar else cargar_cache(contenido, variante=variante)
+    futuro = None
+    if encontrado is not None:
+        afd_dict_min, mapping = encontrado
+        print(f"⚡ AFD recuperado de la caché ({clave_yal(contenido, variante)[:12]}), se omite la construcción.")
+    else:
+        afd_dict_min, mapping, futuro = construir_afd(contenido, output_dir, alfabeto, utf8, diagramas)
+        guardar_cache(contenido, afd_dict_min, mapping, variante=variante)
         
-    # Guardar el AFD minimizado en .pkl
+    # Guardar el AFD minimizado en .pkl (para inspeccionarlo) y como artefacto binario
     afd_pickle_path = f"{output_dir}/afd_min.pkl"
     guardar_afd_pickle(afd_dict_min, afd_pickle_path)
+    afd_binario_path = f"{output_dir}/afd_min.afdb"
+    guardar_afd_binario(afd_dict_min, mapping, afd_binario_path)
 
-    print("\nEstados de aceptación:", afd_dict['accepted'])
-    print(f"\nDiagramas generados en: {output_dir}")
-    mostrar_info_afd("output_afds/" + ruta + "/afd_min.pkl")
+    mostrar_resumen_afd(afd_binario_path)
     print(mapping)
-    
-    # Simulación desde archivo guardado
+
+    # Cargar el scanner del artefacto binario, sin reconstruir el AFD
+    scanner = cargar_afd_binario(afd_binario_path)
+    print(f"✅ AFD cargado correctamente desde: {afd_binario_path}")
+    tokenizar_entrada(scanner, mapping)
+
+    if futuro is not None:
+        try:
+            omitidos = futuro.result()
+        except graphviz.ExecutableNotFound as e:
+            print(f"\n⚠️ No se pudieron generar los diagramas: {e}")
+            return
+        print(f"\n🖼️ Diagramas generados en: {output_dir}")
+        if omitidos:
+            print(f"⏭️ Diagramas omitidos por tamaño: {', '.join(omitidos)}")
+
+def tokenizar_entrada(scanner, mapping):
+    """Pide al usuario una cadena o un archivo y lo tokeniza con 'scanner'."""
     print("\n🔍 ¿Cómo querés ingresar la entrada para tokenizar?")
     print("1. Ingresar una cadena manualmente")
     print("2. Leer la cadena desde un archivo de texto")
+    print("3. Mapear en memoria un archivo grande (solo posiciones de los tokens)")
+
+    opcion = input("Seleccioná una opción (1, 2 o 3): ")
 
-    opcion = input("Seleccioná una opción (1 o 2): ")
+    if opcion not in ('1', '2', '3'):
+        print("⚠️ Opción inválida. Saliendo.")
+        return
 
     if opcion == '1':
         cadena_usuario = input("🔤 Ingresá una cadena para tokenizar: ")
+        if isinstance(scanner, ScannerBytes):
+            cadena_usuario = cadena_usuario.encode('utf-8')
+        # Simular el análisis léxico
+        tokens = lexer(cadena_usuario, scanner, mapping, output_file='salida_logs.txt', debug=True)
+        escribir_tokens(tokens)
     elif opcion == '2':
         ruta_archivo = input("📄 Ingresá la ruta del archivo de texto: ")
         if not os.path.isfile(ruta_archivo):
             print("⚠️ Archivo no encontrado.")
             return
-        with open(ruta_archivo, "r", encoding="utf-8") as f:
-            cadena_usuario = f.read()
-            print(f"\n📚 Contenido del archivo leído:\n{cadena_usuario}")
+        # El archivo se tokeniza por bloques, sin cargarlo entero en memoria
+        diagnostico = DiagnosticoArchivo('salida_logs.txt')
+        # Un AFD sobre bytes lee el archivo en binario, sin decodificarlo
+        modo = {"mode": "rb"} if isinstance(scanner, ScannerBytes) else {"mode": "r", "encoding": "utf-8"}
+        with open(ruta_archivo, **modo) as f:
+            tokens = ((tipo, lexema) for tipo, lexema, _ in lexer_stream(f, scanner, mapping, diagnostico=diagnostico))
+            escribir_tokens(tokens)
+        diagnostico.cerrar()
+        print(f"\n📚 Archivo tokenizado: {ruta_archivo}")
     else:
-        print("⚠️ Opción inválida. Saliendo.")
-        return
-
-    # Cargar el AFD minimizado
-    afd_dict = cargar_afd_pickle(afd_pickle_path)
-
-    # Simular el análisis léxico
-    tokens = lexer(cadena_usuario, afd_dict, mapping, debug=True)
-    
-    output_file='salida_tokens.txt'
-    with open(output_file, 'w', encoding='utf-8') as out:
-        # Mostrar tokens finales
-        out.write("\n🎯 Tokens generados:\n")
-        for tipo, lexema in tokens:
-            out.write(f"  {tipo}: '{lexema}'\n")
+        ruta_archivo = input("📄 Ingresá la ruta del archivo de texto: ")
+        if not os.path.isfile(ruta_archivo):
+            print("⚠️ Archivo no encontrado.")
+            return
+        try:
+            scanner = scanner_de_bytes(scanner)
+        except ValueError as e:
+            print(f"⚠️ {e}.")
+            return
+        escribir_spans(scanner, ruta_archivo)
+        print(f"\n📚 Archivo tokenizado: {ruta_archivo}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Árbol de expresiones regulares que produce el parser de YAL (Lector) y que
+consume afd_directo.build_syntax_tree_ast, sin pasar por cadenas postfix.
+
+Los nodos son inmutables y pueden compartirse: una definición (let) se
+parsea una sola vez y cada regla que la usa apunta al mismo subárbol.
+"""
+
+class CharClass:
+    """
+    Conjunto de códigos de carácter como lista ordenada de rangos
+    [(desde, hasta), ...] disjuntos y no adyacentes; un literal de un
+    carácter es la clase ((código, código),).
+    """
+    __slots__ = ('ranges',)
+
+    def __init__(self, ranges):
+        self.ranges = normalize_ranges(ranges)
+
+class Epsilon:
+    """Cadena vacía."""
+    __slots__ = ()
+
+class Concat:
+    """Concatenación de 'parts', en orden."""
+    __slots__ = ('parts',)
+
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+
+class Alt:
+    """Unión de 'options'."""
+    __slots__ = ('options',)
+
+    def __init__(self, options):
+        self.options = tuple(options)
+
+class Star:
+    """Cero o más repeticiones de 'child'."""
+    __slots__ = ('child',)
+
+    def __init__(self, child):
+        self.child = child
+
+class Plus:
+    """Una o más repeticiones de 'child'."""
+    __slots__ = ('child',)
+
+    def __init__(self, child):
+        self.child = child
+
+class Optional:
+    """'child' o la cadena vacía."""
+    __slots__ = ('child',)
+
+    def __init__(self, child):
+        self.child = child
+
+class Tag:
+    """Marcador de fin de la regla 'number' (#1000, #1001, ...)."""
+    __slots__ = ('number',)
+
+    def __init__(self, number):
+        self.number = number
+
+EPSILON = Epsilon()
+
+# ==== Conjuntos de rangos ====
+# Un conjunto de códigos se representa como una tupla ordenada de rangos
+# cerrados (desde, hasta), disjuntos y no adyacentes. Así una clase como
+# [^'a'] sobre todo Unicode son dos rangos y no un millón de códigos.
+
+def normalize_ranges(ranges):
+    """Ordena y fusiona rangos solapados o adyacentes; retorna una tupla."""
+    result = []
+    for low, high in sorted(ranges):
+        if low > high:
+            continue
+        if result and low <= result[-1][1] + 1:
+            if high > result[-1][1]:
+                result[-1] = (result[-1][0], high)
+        else:
+            result.append((low, high))
+    return tuple(result)
+
+def ranges_union(*sets):
+    """Unión de varios conjuntos de rangos."""
+    return normalize_ranges([r for ranges in sets for r in ranges])
+
+def ranges_difference(left, right):
+    """Códigos de 'left' que no están en 'right'; ambos normalizados."""
+    result = []
+    j = 0
+    for low, high in left:
+        # Los rangos de 'right' que terminan antes de este ya no recortan nada
+        while j < len(right) and right[j][1] < low:
+            j += 1
+        k = j
+        while k < len(right) and right[k][0] <= high:
+            if right[k][0] > low:
+                result.append((low, right[k][0] - 1))
+            low = max(low, right[k][1] + 1)
+            k += 1
+        if low <= high:
+            result.append((low, high))
+    return tuple(result)
+
+def ranges_complement(ranges, alphabet):
+    """Códigos de 'alphabet' (también un conjunto de rangos) que no están en 'ranges'."""
+    return ranges_difference(alphabet, ranges)
+
+def ranges_size(ranges):
+    """Cantidad de códigos del conjunto."""
+    return sum(high - low + 1 for low, high in ranges)
+
+# Clase de un solo código compartida por todos los literales de ese carácter
+_single_chars = {}
+
+def char(code):
+    """Clase de caracteres de un solo código, compartida entre todos sus usos."""
+    node = _single_chars.get(code)
+    if node is None:
+        node = _single_chars[code] = CharClass(((code, code),))
+    return node
+
+def concat(parts):
+    """Concatenación simplificada: sin partes es épsilon y con una sola es esa parte."""
+    parts = [part for part in parts if part is not EPSILON]
+    if not parts:
+        return EPSILON
+    if len(parts) == 1:
+        return parts[0]
+    return Concat(parts)
+
+def alt(options):
+    """Unión simplificada: si todas las opciones son clases de caracteres, es una sola clase."""
+    options = list(options)
+    if len(options) == 1:
+        return options[0]
+    if all(isinstance(option, CharClass) for option in options):
+        return CharClass(ranges_union(*(option.ranges for option in options)))
+    return Alt(options)
+
+# ==== Alfabeto de bytes UTF-8 ====
+
+SURROGATES = ((0xD800, 0xDFFF),)
+UTF8_LIMITS = (0x7F, 0x7FF, 0xFFFF)
+
+def utf8_sequences(low, high):
+    """
+    Descompone el rango de code points [low, high] en secuencias de rangos
+    de bytes: cada secuencia es una lista de (desde, hasta) por byte, y las
+    cadenas UTF-8 del rango son exactamente las que calzan con alguna. Los
+    surrogates (U+D800 a U+DFFF) no se codifican en UTF-8 y se omiten.
+    """
+    sequences = []
+    stack = [(a, b) for a, b in reversed(ranges_difference(((low, high),), SURROGATES))]
+    while stack:
+        low, high = stack.pop()
+        # Partir donde cambia la cantidad de bytes de la codificación
+        split = next((limit for limit in UTF8_LIMITS if low <= limit < high), None)
+        if split is not None:
+            stack.append((split + 1, high))
+            stack.append((low, split))
+            continue
+        if high <= 0x7F:
+            sequences.append([(low, high)])
+            continue
+        # Partir hasta que los bytes de continuación cubran rangos completos
+        for i in (1, 2, 3):
+            mask = (1 << (6 * i)) - 1
+            if low & ~mask != high & ~mask:
+                if low & mask:
+                    stack.append(((low | mask) + 1, high))
+                    stack.append((low, low | mask))
+                    break
+                if high & mask != mask:
+                    stack.append((high & ~mask, high))
+                    stack.append((low, (high & ~mask) - 1))
+                    break
+        else:
+            desde = chr(low).encode('utf-8')
+            hasta = chr(high).encode('utf-8')
+            sequences.append(list(zip(desde, hasta)))
+    return sequences
+
+def to_utf8(ast):
+    """
+    Traduce un árbol sobre code points a uno equivalente sobre los bytes de
+    su codificación UTF-8: cada clase de caracteres se vuelve la unión de
+    sus secuencias de bytes (ver utf8_sequences). Los subárboles
+    compartidos se traducen una sola vez. El recorrido es iterativo, en
+    postorden, para no depender de la profundidad del árbol.
+    """
+    memo = {}
+    done = []  # Nodos ya traducidos, en orden
+    stack = [(ast, False)]
+    while stack:
+        node, visited = stack.pop()
+        result = memo.get(id(node))
+        if result is not None:
+            done.append(result)
+            continue
+        kind = type(node)
+
+        if kind is Concat or kind is Alt:
+            children = node.parts if kind is Concat else node.options
+        elif kind in (Star, Plus, Optional):
+            children = (node.child,)
+        else:
+            children = ()
+        if children and not visited:
+            stack.append((node, True))
+            for child in reversed(children):
+                stack.append((child, False))
+            continue
+
+        translated = done[len(done) - len(children):]
+        del done[len(done) - len(children):]
+        if kind is CharClass:
+            if node.ranges[-1][1] <= 0x7F:
+                result = node
+            else:
+                options = []
+                for low, high in node.ranges:
+                    for sequence in utf8_sequences(low, high):
+                        options.append(concat(CharClass((r,)) for r in sequence))
+                result = alt(options) if options else EPSILON
+        elif kind is Concat:
+            result = Concat(translated)
+        elif kind is Alt:
+            result = alt(translated)
+        elif kind in (Star, Plus, Optional):
+            result = kind(translated[0])
+        else:
+            result = node
+        memo[id(node)] = result
+        done.append(result)
+
+    return done[0]
@@ -21,36 +21,23 @@ def sp_manual(texto):
     return texto[inicio:fin+1] if inicio <= fin else ''
 
 def st_manual(texto):
-    partes = []
-    actual = ""
-    for ch in texto:
-        if ch == ' ':
-            if actual:
-                partes.append(actual)
-                actual = ""
-        else:
-            actual += ch
-    if actual:
-        partes.append(actual)
-    return partes
+    return [parte for parte in texto.split(' ') if parte]
 
 def tokenize(expr: str) -> list:
     tokens = []
     i = 0
     while i < len(expr):
         if expr[i] == '#' and i + 1 < len(expr) and expr[i+1].isdigit():
-            tag = "#"
+            inicio = i
             i += 1
             while i < len(expr) and expr[i].isdigit():
-                tag += expr[i]
                 i += 1
-            tokens.append(tag)
+            tokens.append(expr[inicio:i])
         elif expr[i].isdigit():
-            num = ""
+            inicio = i
             while i < len(expr) and expr[i].isdigit():
-                num += expr[i]
                 i += 1
-            tokens.append(num)
+            tokens.append(expr[inicio:i])
         elif expr[i] in ['(', ')', '|', '.', '*', '+', '?', '#']:
             tokens.append(expr[i])
             i += 1